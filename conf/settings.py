@@ -42,6 +42,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "sportova.instrumentation.RequestTimingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -55,16 +56,27 @@ ROOT_URLCONF = "conf.urls"
 
 TEMPLATES = [
     {
-        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        # DjangoTemplates that reports render time to sportova.instrumentation.RequestTimingMiddleware
+        "BACKEND": "sportova.instrumentation.TimedDjangoTemplates",
         "DIRS": [BASE_DIR / "templates"],
-        "APP_DIRS": True,
         "OPTIONS": {
+            # Parse each template once per process, in development too
+            "loaders": [
+                (
+                    "django.template.loaders.cached.Loader",
+                    [
+                        "django.template.loaders.filesystem.Loader",
+                        "django.template.loaders.app_directories.Loader",
+                    ],
+                ),
+            ],
             "context_processors": [
                 "django.template.context_processors.request",
                 "django.contrib.auth.context_processors.auth",
                 "django.contrib.messages.context_processors.messages",
                 "sportova.context_processors.site_contacts",
                 "sportova.context_processors.background_images",
+                "sportova.context_processors.catalog",
             ],
         },
     },
@@ -84,6 +96,22 @@ DATABASES = {
 }
 
 
+# Cache
+# The catalog version, page cache and background stylesheet are invalidated
+# through this cache, so it must be shared by the web workers and the
+# management commands (import_catalog, generate_image_variants, ...).
+# The file cache works on a single host; use Redis across hosts, e.g.
+# CACHE_BACKEND=django.core.cache.backends.redis.RedisCache CACHE_LOCATION=redis://127.0.0.1:6379/1
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+CACHES = {
+    "default": {
+        "BACKEND": config("CACHE_BACKEND", default="django.core.cache.backends.filebased.FileBasedCache"),
+        "LOCATION": config("CACHE_LOCATION", default=str(BASE_DIR / ".cache")),
+    }
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -124,6 +152,17 @@ STATICFILES_DIRS = [
 ]
 STATIC_ROOT = BASE_DIR / "staticfiles"
 
+# collectstatic builds the CSS bundles, fingerprints every file and writes
+# .gz/.br copies; serve STATIC_ROOT with far-future, immutable Cache-Control
+STORAGES = {
+    "default": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+    },
+    "staticfiles": {
+        "BACKEND": "sportova.assets.BundledManifestStaticFilesStorage",
+    },
+}
+
 # Media files
 MEDIA_URL = "media/"
 MEDIA_ROOT = BASE_DIR / "media"
@@ -149,3 +188,35 @@ EMAIL_USE_SSL = config('EMAIL_USE_SSL', cast=bool)
 # Email settings for contact form
 DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL')
 SPORTOVA_OWNER_EMAIL = config('SPORTOVA_OWNER_EMAIL')
+
+# Catalog page cache (keyed on a catalog version bumped by model signals;
+# needs the shared CACHES backend above, see sportova.checks)
+SPORTOVA_CATALOG_CACHE_ENABLED = config('SPORTOVA_CATALOG_CACHE_ENABLED', default=True, cast=bool)
+SPORTOVA_CATALOG_CACHE_TIMEOUT = 60 * 60
+SPORTOVA_CATALOG_CACHE_DISABLED_VIEWS = []
+# Route the storefront to sportova.async_views; only worth it when served through conf.asgi
+SPORTOVA_ASYNC_VIEWS = config('SPORTOVA_ASYNC_VIEWS', default=False, cast=bool)
+# Rendered product cards ({% cache %} in includes/product_card.html); 0 disables
+SPORTOVA_PRODUCT_CARD_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Outbound email queue (drained by `manage.py process_email_queue`)
+SPORTOVA_EMAIL_QUEUE_MAX_ATTEMPTS = 6
+SPORTOVA_EMAIL_QUEUE_RETRY_DELAY = 30  # seconds, doubled after every failed attempt
+SPORTOVA_EMAIL_QUEUE_MAX_RETRY_DELAY = 60 * 60
+SPORTOVA_EMAIL_QUEUE_LOCK_TIMEOUT = 10 * 60
+SPORTOVA_EMAIL_CONNECTION_IDLE_TIMEOUT = 30  # seconds before a pooled SMTP connection is closed
+
+# Request instrumentation (sportova.instrumentation.RequestTimingMiddleware)
+SPORTOVA_SERVER_TIMING = True
+# Most queries each view may run on a cold cache; 'warn' logs overruns, 'raise' fails the request
+SPORTOVA_QUERY_BUDGETS = {
+    'sportova:home': 5,
+    'sportova:product_list': 5,
+    'sportova:product_detail': 5,
+    'sportova:category_list': 3,
+    'sportova:category_detail': 4,
+    'sportova:search': 6,
+    'sportova:shipment': 2,
+    'sportova:contact': 6,
+}
+SPORTOVA_QUERY_BUDGET_ACTION = config('SPORTOVA_QUERY_BUDGET_ACTION', default='warn')
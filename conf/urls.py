@@ -21,7 +21,8 @@ from django.conf.urls.static import static
 
 urlpatterns = [
     path("admin/", admin.site.urls),
-    path("", include("sportova.urls")),
+    # Async storefront views for ASGI deployments (conf.asgi); see sportova.async_views
+    path("", include("sportova.async_urls" if settings.SPORTOVA_ASYNC_VIEWS else "sportova.urls")),
 ]
 
 # Serve media files during development
@@ -2,8 +2,56 @@ from django.contrib import admin
 from .models import (
     Category, Product, ProductImage,
     Shipment, BannerPicture, BackgroundImage,
-    ContactMessage, ContactReply
+    ContactMessage, ContactReply, OutboundEmail, ImageVariantJob
 )
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connection
+from django.db.models import Count, Q
+from django.utils import timezone
+from django.utils.functional import cached_property
+from .search import search_filter
+
+# Unfiltered changelists of tables estimated above this many rows skip COUNT(*)
+ESTIMATED_COUNT_THRESHOLD = getattr(settings, 'SPORTOVA_ADMIN_ESTIMATED_COUNT_THRESHOLD', 10000)
+
+
+def estimated_row_count(model):
+    """The database's own row estimate for a model's table, or None where there isn't one"""
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE relname = %s", [table])
+        elif connection.vendor == 'mysql':
+            cursor.execute(
+                "SELECT table_rows FROM information_schema.tables "
+                "WHERE table_schema = DATABASE() AND table_name = %s", [table]
+            )
+        else:
+            return None
+        row = cursor.fetchone()
+    # Postgres reports -1 for tables that were never analyzed
+    return row[0] if row and row[0] is not None and row[0] >= 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator that uses the planner's row estimate for unfiltered lists of large tables"""
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if hasattr(queryset, 'query') and not queryset.query.where:
+            estimate = estimated_row_count(queryset.model)
+            if estimate is not None and estimate > ESTIMATED_COUNT_THRESHOLD:
+                return estimate
+        return super().count
+
+
+class LargeChangelistMixin:
+    """100 rows per page without the exact COUNT(*) queries over the whole table"""
+    list_per_page = 100
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 
 @admin.register(Category)
@@ -22,17 +70,18 @@ class ProductImageInline(admin.TabularInline):
 
 
 @admin.register(Product)
-class ProductAdmin(admin.ModelAdmin):
+class ProductAdmin(LargeChangelistMixin, admin.ModelAdmin):
     list_display = ['id', 'name', 'category', 'size', 'price', 'is_featured', 'created_at']
+    list_select_related = ['category']
     list_filter = ['category', 'size', 'is_featured', 'created_at']
-    search_fields = ['name', 'description']
+    search_fields = ['name', 'sku', 'description']
     list_editable = ['is_featured', 'size']
     prepopulated_fields = {'slug': ('name',)}
     readonly_fields = ['created_at', 'updated_at']
     inlines = [ProductImageInline]
     fieldsets = (
         ('Product Information', {
-            'fields': ('name', 'category', 'slug', 'description', 'price', 'size')
+            'fields': ('name', 'category', 'slug', 'sku', 'description', 'price', 'size')
         }),
         ('Settings', {
             'fields': ('is_featured',)
@@ -43,6 +92,13 @@ class ProductAdmin(admin.ModelAdmin):
         })
     )
 
+    def get_search_results(self, request, queryset, search_term):
+        # The full-text index (as a subquery) and an exact SKU match instead of icontains scans
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        return queryset.filter(search_filter(search_term) | Q(sku=search_term)), False
+
 
 @admin.register(Shipment)
 class ShipmentAdmin(admin.ModelAdmin):
@@ -62,8 +118,9 @@ class ShipmentAdmin(admin.ModelAdmin):
 
 
 @admin.register(ProductImage)
-class ProductImageAdmin(admin.ModelAdmin):
+class ProductImageAdmin(LargeChangelistMixin, admin.ModelAdmin):
     list_display = ['id', 'product', 'is_primary', 'created_at']
+    list_select_related = ['product']
     list_filter = ['is_primary', 'created_at']
     search_fields = ['product__name', 'alt_text']
     readonly_fields = ['created_at']
@@ -107,7 +164,7 @@ class ContactReplyInline(admin.TabularInline):
 
 
 @admin.register(ContactMessage)
-class ContactMessageAdmin(admin.ModelAdmin):
+class ContactMessageAdmin(LargeChangelistMixin, admin.ModelAdmin):
     list_display = ['id', 'subject', 'name', 'email', 'status', 'reply_count', 'created_at']
     list_filter = ['status', 'created_at']
     search_fields = ['name', 'email', 'subject', 'message']
@@ -135,6 +192,13 @@ class ContactMessageAdmin(admin.ModelAdmin):
 
     actions = ['mark_in_progress', 'mark_closed']
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(reply_total=Count('replies'))
+
+    @admin.display(description='Reply count', ordering='reply_total')
+    def reply_count(self, obj):
+        return obj.reply_total
+
     def mark_in_progress(self, request, queryset):
         updated = queryset.update(status='in_progress')
         self.message_user(request, f"Marked {updated} message(s) as In Progress")
@@ -147,8 +211,9 @@ class ContactMessageAdmin(admin.ModelAdmin):
 
 
 @admin.register(ContactReply)
-class ContactReplyAdmin(admin.ModelAdmin):
+class ContactReplyAdmin(LargeChangelistMixin, admin.ModelAdmin):
     list_display = ['id', 'contact_message', 'reply_subject', 'sent_by', 'email_sent', 'sent_at']
+    list_select_related = ['contact_message']
     list_filter = ['email_sent', 'sent_at', 'sent_by']
     search_fields = ['reply_subject', 'reply_message', 'contact_message__subject']
     readonly_fields = ['sent_at', 'email_sent']
@@ -173,3 +238,43 @@ class BannerPictureAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         })
     )
+
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(LargeChangelistMixin, admin.ModelAdmin):
+    list_display = ['id', 'kind', 'contact_message', 'status', 'attempts', 'next_attempt_at', 'sent_at']
+    list_filter = ['status', 'kind', 'created_at']
+    search_fields = ['contact_message__email', 'contact_message__subject', 'last_error']
+    list_select_related = ['contact_message']
+    readonly_fields = [
+        'kind', 'contact_message', 'reply', 'attempts', 'locked_at',
+        'last_error', 'sent_at', 'created_at', 'updated_at'
+    ]
+
+    actions = ['requeue']
+
+    def requeue(self, request, queryset):
+        updated = queryset.exclude(status='sent').update(
+            status='pending', attempts=0, next_attempt_at=timezone.now(), locked_at=None
+        )
+        self.message_user(request, f"Requeued {updated} email(s)")
+    requeue.short_description = 'Requeue selected emails'
+
+
+@admin.register(ImageVariantJob)
+class ImageVariantJobAdmin(LargeChangelistMixin, admin.ModelAdmin):
+    list_display = ['id', 'name', 'status', 'variant_count', 'attempts', 'updated_at']
+    list_filter = ['status']
+    search_fields = ['name', 'last_error']
+    readonly_fields = [
+        'name', 'source_hash', 'source_mtime', 'variant_count', 'attempts',
+        'last_error', 'created_at', 'updated_at'
+    ]
+
+    actions = ['requeue']
+
+    def requeue(self, request, queryset):
+        # Clearing the hash makes the worker rebuild even an unchanged original
+        updated = queryset.update(status='pending', attempts=0, source_hash='')
+        self.message_user(request, f"Requeued {updated} image(s)")
+    requeue.short_description = 'Rebuild variants of selected images'
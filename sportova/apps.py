@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class SportovaConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "sportova"
+
+    def ready(self):
+        from . import checks, signals  # noqa: F401
@@ -0,0 +1,145 @@
+"""Static asset pipeline
+
+The site and page stylesheets live as plain files in static/css. At
+`collectstatic` time BundledManifestStaticFilesStorage concatenates and
+minifies each bundle in CSS_BUNDLES, fingerprints everything like
+ManifestStaticFilesStorage, and writes gzip (and, with Brotli installed,
+brotli) copies next to the hashed files for the web server to send as-is.
+The stylesheet_bundle tag in sportova_assets links the bundle once it has
+been collected and the source files before that (development, tests).
+
+Bootstrap, Font Awesome and the Google web fonts are self-hosted from
+static/vendor once `manage.py vendor_assets` has downloaded and subsetted
+them; until then the vendor_* tags link the CDN copies.
+"""
+import functools
+import gzip
+import json
+import re
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage, staticfiles_storage
+from django.core.files.base import ContentFile
+
+try:
+    import brotli
+except ImportError:  # .br copies are skipped without it
+    brotli = None
+
+# Bundle name -> (output path, source paths), all relative to the static root
+CSS_BUNDLES = getattr(settings, 'SPORTOVA_CSS_BUNDLES', {
+    'sportova': ('css/sportova.bundle.css', ['css/base.css']),
+    'product_detail': ('css/product-detail.bundle.css', ['css/product-detail.css']),
+    'shipment': ('css/shipment.bundle.css', ['css/shipment.css']),
+    'error_404': ('css/error-404.bundle.css', ['css/error-404.css']),
+    'error_500': ('css/error-500.bundle.css', ['css/error-500.css']),
+})
+COMPRESSIBLE_EXTENSIONS = ('.css', '.js', '.svg')
+
+BOOTSTRAP_CSS_URL = 'https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css'
+BOOTSTRAP_JS_URL = 'https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/js/bootstrap.bundle.min.js'
+FONT_AWESOME_URL = 'https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.4.0/css/all.min.css'
+# Family -> weights Google Fonts offers; vendor_assets fetches only the ones the CSS uses
+GOOGLE_FONT_FAMILIES = {
+    'Inter': (100, 200, 300, 400, 500, 600, 700, 800, 900),
+    'Space Grotesk': (300, 400, 500, 600, 700),
+    'JetBrains Mono': (300, 400, 500, 600, 700),
+    'Outfit': (100, 200, 300, 400, 500, 600, 700, 800, 900),
+}
+
+
+def google_fonts_url(weights_by_family):
+    families = '&'.join(
+        f"family={family.replace(' ', '+')}:wght@{';'.join(str(weight) for weight in sorted(weights))}"
+        for family, weights in weights_by_family.items()
+    )
+    return f'https://fonts.googleapis.com/css2?{families}&display=swap'
+
+
+CDN_STYLESHEETS = [BOOTSTRAP_CSS_URL, FONT_AWESOME_URL, google_fonts_url(GOOGLE_FONT_FAMILIES)]
+CDN_SCRIPTS = [BOOTSTRAP_JS_URL]
+
+# Written by vendor_assets: the local stylesheets, scripts and fonts to preload
+VENDOR_DIR = 'vendor'
+VENDOR_MANIFEST = f'{VENDOR_DIR}/manifest.json'
+
+_STRING_OR_COMMENT = re.compile(r'"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'|/\*.*?\*/', re.S)
+
+
+def _squeeze(code):
+    code = re.sub(r'\s+', ' ', code)
+    code = re.sub(r' ?([{};,>]) ?', r'\1', code)
+    return code.replace(': ', ':').replace(';}', '}')
+
+
+def minify_css(css):
+    """Drop comments and insignificant whitespace; strings (and data: URLs in them) are kept verbatim"""
+    strings = []
+
+    def stash(match):
+        if match.group().startswith('/*'):
+            return ' '
+        strings.append(match.group())
+        return f'\x00{len(strings) - 1}\x00'
+
+    code = _squeeze(_STRING_OR_COMMENT.sub(stash, css)).strip()
+    return re.sub(r'\x00(\d+)\x00', lambda match: strings[int(match.group(1))], code)
+
+
+@functools.lru_cache(maxsize=None)
+def vendor_manifest():
+    """The vendor_assets manifest, or None if the assets haven't been vendored"""
+    path = finders.find(VENDOR_MANIFEST)
+    if path is None:
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def bundle_is_collected(output):
+    """Whether collectstatic built this bundle into the manifest the site is serving"""
+    return not settings.DEBUG and output in getattr(staticfiles_storage, 'hashed_files', {})
+
+
+class BundledManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """ManifestStaticFilesStorage that also builds CSS bundles and pre-compressed copies"""
+
+    def stored_name(self, name):
+        if not self.hashed_files:
+            # collectstatic hasn't run here (development, tests); use the files as they are
+            return name
+        return super().stored_name(name)
+
+    def _replace(self, name, content):
+        if self.exists(name):
+            self.delete(name)
+        self.save(name, ContentFile(content))
+
+    def build_bundles(self):
+        """Write every CSS bundle from the collected sources; returns the bundle paths"""
+        for output, sources in CSS_BUNDLES.values():
+            chunks = []
+            for source in sources:
+                with self.open(source) as f:
+                    chunks.append(minify_css(f.read().decode()))
+            self._replace(output, '\n'.join(chunks).encode())
+            yield output
+
+    def compress(self, name):
+        with self.open(name) as f:
+            data = f.read()
+        # mtime=0 keeps the .gz identical between runs
+        self._replace(f'{name}.gz', gzip.compress(data, 9, mtime=0))
+        if brotli is not None:
+            self._replace(f'{name}.br', brotli.compress(data))
+
+    def post_process(self, paths, dry_run=False, **options):
+        if not dry_run:
+            for output in self.build_bundles():
+                paths[output] = (self, output)
+        yield from super().post_process(paths, dry_run, **options)
+        if not dry_run:
+            for name in set(self.hashed_files.values()):
+                if name.endswith(COMPRESSIBLE_EXTENSIONS):
+                    self.compress(name)
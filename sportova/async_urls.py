@@ -0,0 +1,17 @@
+from django.urls import path
+from . import async_views, views
+
+# The storefront URLs served by the async views; conf.urls picks this module when SPORTOVA_ASYNC_VIEWS is on
+app_name = 'sportova'
+
+urlpatterns = [
+    path('', async_views.home, name='home'),
+    path('products/', async_views.product_list, name='product_list'),
+    path('product/<slug:slug>/', async_views.product_detail, name='product_detail'),
+    path('categories/', async_views.category_list, name='category_list'),
+    path('category/<slug:slug>/', async_views.category_detail, name='category_detail'),
+    path('search/', async_views.search, name='search'),
+    path('shipment/', async_views.shipment, name='shipment'),
+    path('contact/', async_views.contact, name='contact'),
+    path('css/backgrounds.<str:version>.css', views.background_stylesheet, name='background_stylesheet'),
+]
@@ -0,0 +1,134 @@
+"""Async versions of the storefront views, for serving under ASGI
+
+Routed by sportova.async_urls when SPORTOVA_ASYNC_VIEWS is on. Rows are
+fetched with the async ORM and fully materialized before rendering.
+Rendering itself runs through sync_to_async because the context processors
+(session, messages, backgrounds) and the template engine are sync. Cache
+and conditional-GET handling is shared with sportova.views, so both
+variants serve the same cached pages.
+"""
+from asgiref.sync import sync_to_async
+from django.contrib import messages
+from django.core.paginator import Paginator
+from django.shortcuts import aget_object_or_404, redirect, render
+
+from .cache import catalog_cache_page, catalog_condition
+from .facets import FacetFilters, build_facets
+from .forms import ContactForm
+from .models import BannerPicture, Category, Product, Shipment
+from .pagination import apaginate_products
+from .search import search_products
+from .tasks import aenqueue_contact_emails
+
+
+async def _render(request, template_name, context):
+    return await sync_to_async(render)(request, template_name, context)
+
+
+@catalog_cache_page
+async def home(request):
+    """Homepage with featured products and categories"""
+    context = {
+        'categories': [category async for category in Category.objects.all()[:6]],
+        'featured_products': [
+            product async for product in Product.objects.with_card_data().filter(is_featured=True)[:6]
+        ],
+        'banner_pictures': [banner async for banner in BannerPicture.objects.filter(is_active=True)[:5]],
+    }
+    return await _render(request, 'sportova/home.html', context)
+
+
+@catalog_condition
+@catalog_cache_page
+async def product_list(request):
+    """View to display all products, filterable by category, size, price and featured"""
+    categories = [category async for category in Category.objects.all()]
+    filters = FacetFilters(request.GET, categories)
+    product_list = filters.apply(Product.objects.with_card_data().order_by('-created_at'))
+    products = await apaginate_products(request, product_list, 9)
+
+    context = {
+        'products': products,
+        'categories': categories,
+        'current_category': filters.category.slug if filters.category else None,
+        'filters': filters,
+        # The facet summary is cached; on a miss it runs a few sync aggregate queries
+        'facets': await sync_to_async(build_facets)(filters, categories),
+        'page_query': filters.query_prefix(),
+    }
+    return await _render(request, 'sportova/product_list.html', context)
+
+
+@catalog_condition
+@catalog_cache_page
+async def product_detail(request, slug):
+    """Product detail page showing image, price, description and contact options"""
+    product = await aget_object_or_404(Product.objects.with_card_data(), slug=slug)
+    related_products = (
+        Product.objects.with_card_data().filter(category=product.category_id).exclude(slug=slug)[:3]
+    )
+    context = {
+        'product': product,
+        'category': product.category,
+        'related_products': [related async for related in related_products],
+    }
+    return await _render(request, 'sportova/product_detail.html', context)
+
+
+@catalog_condition
+@catalog_cache_page
+async def category_detail(request, slug):
+    """Category page showing all products in that category"""
+    category = await aget_object_or_404(Category, slug=slug)
+    products = await apaginate_products(request, Product.objects.with_card_data().filter(category=category), 9)
+    return await _render(request, 'sportova/category_detail.html', {'category': category, 'products': products})
+
+
+@catalog_condition
+@catalog_cache_page
+async def category_list(request):
+    """Category list page showing all categories"""
+    paginator = Paginator(Category.objects.all().order_by('name'), 6)
+    categories = await sync_to_async(paginator.get_page)(request.GET.get('page'))
+    return await _render(request, 'sportova/category_list.html', {'categories': categories})
+
+
+async def search(request):
+    """Product search with ranking, prefix matching and an optional category filter"""
+    query = request.GET.get('q', '').strip()
+    category_slug = request.GET.get('category')
+    category = await aget_object_or_404(Category, slug=category_slug) if category_slug else None
+    products = await sync_to_async(search_products)(query, category.pk if category else None) if query else []
+
+    context = {
+        'query': query,
+        'products': products,
+        'categories': [c async for c in Category.objects.all()],
+        'current_category': category,
+    }
+    return await _render(request, 'sportova/search.html', context)
+
+
+@catalog_condition
+@catalog_cache_page
+async def shipment(request):
+    """Shipment detail page showing image, description, delivery time and cost"""
+    context = {'shipment': [row async for row in Shipment.objects.all()]}
+    return await _render(request, 'sportova/shipment.html', context)
+
+
+async def contact(request):
+    """Contact page to submit inquiries; the emails are queued for process_email_queue, never sent inline"""
+    if request.method == 'POST':
+        form = ContactForm(request.POST)
+        if form.is_valid():
+            contact_message = form.save(commit=False)
+            await contact_message.asave()
+            await aenqueue_contact_emails(contact_message)
+            messages.success(request, 'Thanks for contacting Sportova! We will get back to you shortly.')
+            return redirect('sportova:contact')
+        messages.error(request, 'Please correct the errors below and resubmit.')
+    else:
+        form = ContactForm()
+
+    return await _render(request, 'sportova/contact.html', {'form': form})
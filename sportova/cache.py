@@ -0,0 +1,206 @@
+import hashlib
+from collections import Counter
+from datetime import timedelta
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib import messages
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils import timezone
+from django.views.decorators.http import condition
+
+CATALOG_VERSION_KEY = 'sportova:catalog-version'
+# When the catalog version last moved; the Last-Modified of every catalog page
+CATALOG_CHANGED_KEY = 'sportova:catalog-changed-at'
+
+# Per-process hit/miss counters keyed by view name
+catalog_cache_stats = {'hits': Counter(), 'misses': Counter(), 'bypass': Counter()}
+
+
+def get_catalog_version():
+    """Current catalog version; every cached catalog page and fragment is keyed on it"""
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        cache.add(CATALOG_VERSION_KEY, 1, None)
+        version = cache.get(CATALOG_VERSION_KEY, 1)
+    return version
+
+
+def bump_catalog_version():
+    """Invalidate every cached catalog page by moving to a new version"""
+    try:
+        version = cache.incr(CATALOG_VERSION_KEY)
+    except ValueError:
+        # Key missing (cache cleared or never set); start a fresh sequence
+        cache.add(CATALOG_VERSION_KEY, 2, None)
+        version = cache.get(CATALOG_VERSION_KEY, 2)
+    cache.set(CATALOG_CHANGED_KEY, timezone.now(), None)
+    return version
+
+
+def get_catalog_changed_at():
+    """When the catalog last changed, deletes included"""
+    changed_at = cache.get(CATALOG_CHANGED_KEY)
+    if changed_at is None:
+        cache.add(CATALOG_CHANGED_KEY, timezone.now(), None)
+        changed_at = cache.get(CATALOG_CHANGED_KEY, timezone.now())
+    return changed_at
+
+
+def catalog_cache_enabled(view_name):
+    if not getattr(settings, 'SPORTOVA_CATALOG_CACHE_ENABLED', True):
+        return False
+    return view_name not in getattr(settings, 'SPORTOVA_CATALOG_CACHE_DISABLED_VIEWS', ())
+
+
+def _page_cache_key(request, view_name):
+    path_hash = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return f'sportova:page:{get_catalog_version()}:{view_name}:{path_hash}'
+
+
+def _bypass_page_cache(request, view_name):
+    return (
+        request.method not in ('GET', 'HEAD')
+        or not catalog_cache_enabled(view_name)
+        or len(messages.get_messages(request))
+    )
+
+
+def _page_cache_timeout():
+    return getattr(settings, 'SPORTOVA_CATALOG_CACHE_TIMEOUT', 60 * 60)
+
+
+def _cached_response(cached):
+    response = HttpResponse(cached['content'], content_type=cached['content_type'])
+    response['X-Catalog-Cache'] = 'hit'
+    return response
+
+
+def _cacheable_content(response):
+    """What to store for a freshly rendered response, or None if it shouldn't be cached"""
+    if response.status_code != 200 or response.streaming:
+        return None
+    if hasattr(response, 'render') and callable(response.render):
+        response.render()
+    return {'content': response.content, 'content_type': response['Content-Type']}
+
+
+def catalog_cache_page(view_func):
+    """Cache a read-only catalog view until the catalog version changes
+
+    Only GET/HEAD requests without pending flash messages are served from
+    cache. Views can be opted out with
+    SPORTOVA_CATALOG_CACHE_DISABLED_VIEWS or globally with
+    SPORTOVA_CATALOG_CACHE_ENABLED = False. Works on sync and async views.
+    """
+    view_name = view_func.__name__
+
+    if iscoroutinefunction(view_func):
+        @wraps(view_func)
+        async def async_wrapper(request, *args, **kwargs):
+            # Reading the flash messages may load the session from the database
+            if await sync_to_async(_bypass_page_cache)(request, view_name):
+                catalog_cache_stats['bypass'][view_name] += 1
+                return await view_func(request, *args, **kwargs)
+
+            key = _page_cache_key(request, view_name)
+            cached = await cache.aget(key)
+            if cached is not None:
+                catalog_cache_stats['hits'][view_name] += 1
+                return _cached_response(cached)
+
+            catalog_cache_stats['misses'][view_name] += 1
+            response = await view_func(request, *args, **kwargs)
+            content = _cacheable_content(response)
+            if content is not None:
+                await cache.aset(key, content, _page_cache_timeout())
+            response['X-Catalog-Cache'] = 'miss'
+            return response
+
+        return async_wrapper
+
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        if _bypass_page_cache(request, view_name):
+            catalog_cache_stats['bypass'][view_name] += 1
+            return view_func(request, *args, **kwargs)
+
+        key = _page_cache_key(request, view_name)
+        cached = cache.get(key)
+        if cached is not None:
+            catalog_cache_stats['hits'][view_name] += 1
+            return _cached_response(cached)
+
+        catalog_cache_stats['misses'][view_name] += 1
+        response = view_func(request, *args, **kwargs)
+        content = _cacheable_content(response)
+        if content is not None:
+            cache.set(key, content, _page_cache_timeout())
+        response['X-Catalog-Cache'] = 'miss'
+        return response
+
+    return wrapper
+
+
+def _catalog_validators(request, view_name):
+    """(etag, last_modified) for a catalog view, or (None, None) to skip conditional handling"""
+    if request.method not in ('GET', 'HEAD') or len(messages.get_messages(request)):
+        return None, None
+
+    # Every catalog change moves the version, so it stands in for the page content
+    etag = hashlib.md5(f'{get_catalog_version()}:{view_name}'.encode()).hexdigest()
+    changed_at = get_catalog_changed_at()
+    # HTTP dates have whole-second precision: until the second of the last change is over,
+    # a later change could carry the same date, so leave revalidation to the ETag
+    if changed_at.replace(microsecond=0) + timedelta(seconds=1) > timezone.now():
+        return etag, None
+    return etag, changed_at
+
+
+def catalog_condition(view_func):
+    """Answer conditional GETs for a catalog view with ETag/Last-Modified, before rendering it
+
+    The validators come from the catalog version and the time it last moved,
+    so checking them costs no queries and any change (deletes included)
+    invalidates them.
+    """
+    view_name = view_func.__name__
+
+    def validators(request, *args, **kwargs):
+        if not hasattr(request, '_catalog_validators'):
+            request._catalog_validators = _catalog_validators(request, view_name)
+        return request._catalog_validators
+
+    conditional_view = condition(
+        etag_func=lambda request, *args, **kwargs: validators(request)[0],
+        last_modified_func=lambda request, *args, **kwargs: validators(request)[1],
+    )(view_func)
+    if not iscoroutinefunction(view_func):
+        return conditional_view
+
+    @wraps(view_func)
+    async def async_wrapper(request, *args, **kwargs):
+        # condition() calls the validator functions synchronously, and reading the flash
+        # messages may load the session from the database; resolve them off the event loop
+        await sync_to_async(validators)(request)
+        return await conditional_view(request, *args, **kwargs)
+
+    return async_wrapper
+
+
+def get_catalog_cache_stats():
+    """Hit/miss/bypass counts and hit ratio per view for this process"""
+    stats = {}
+    views = set().union(*catalog_cache_stats.values())
+    for view_name in sorted(views):
+        hits = catalog_cache_stats['hits'][view_name]
+        misses = catalog_cache_stats['misses'][view_name]
+        stats[view_name] = {
+            'hits': hits,
+            'misses': misses,
+            'bypass': catalog_cache_stats['bypass'][view_name],
+            'hit_ratio': hits / (hits + misses) if hits + misses else 0.0,
+        }
+    return stats
@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.core import checks
+
+LOCAL_MEMORY_CACHE = 'django.core.cache.backends.locmem.LocMemCache'
+
+
+@checks.register(checks.Tags.caches)
+def check_catalog_cache_backend(app_configs, **kwargs):
+    """The catalog version only reaches other processes through a shared cache"""
+    if not getattr(settings, 'SPORTOVA_CATALOG_CACHE_ENABLED', True):
+        return []
+    backend = settings.CACHES.get('default', {}).get('BACKEND', LOCAL_MEMORY_CACHE)
+    if backend != LOCAL_MEMORY_CACHE:
+        return []
+    return [checks.Error(
+        'SPORTOVA_CATALOG_CACHE_ENABLED needs a cache shared between processes, but the default cache '
+        'is local-memory: catalog changes made by management commands and other workers would not '
+        'invalidate cached pages.',
+        hint='Configure a file-based, database or Redis cache in CACHES, or set SPORTOVA_CATALOG_CACHE_ENABLED=False.',
+        id='sportova.E001',
+    )]
@@ -0,0 +1,83 @@
+"""WhatsApp and email contact links
+
+The cleaned WhatsApp number and the site contact context are computed once
+per process (and again if the settings change, e.g. under override_settings).
+Product links are memoized per (pk, updated_at), so grids and product pages
+don't re-run the regex and URL encoding for every card.
+"""
+import functools
+import re
+import threading
+from collections import OrderedDict
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+PRODUCT_LINKS_CACHE_SIZE = getattr(settings, 'SPORTOVA_PRODUCT_LINKS_CACHE_SIZE', 4096)
+
+_product_links = OrderedDict()
+_product_links_lock = threading.Lock()
+
+
+@functools.lru_cache(maxsize=None)
+def whatsapp_number():
+    """WHATSAPP_NUMBER as digits only, the form wa.me expects"""
+    return re.sub(r'\D', '', getattr(settings, 'WHATSAPP_NUMBER', ''))
+
+
+@functools.lru_cache(maxsize=None)
+def site_contact_context():
+    return {
+        'CONTACT_EMAIL': getattr(settings, 'CONTACT_EMAIL', ''),
+        'WHATSAPP_NUMBER': getattr(settings, 'WHATSAPP_NUMBER', ''),
+        'WHATSAPP_NUMBER_CLEAN': whatsapp_number(),
+    }
+
+
+def whatsapp_url(text):
+    return f'https://wa.me/{whatsapp_number()}?text={quote(text)}'
+
+
+def mailto_url(recipient, subject, body=''):
+    url = f'mailto:{recipient}?subject={quote(subject)}'
+    return f'{url}&body={quote(body)}' if body else url
+
+
+def build_product_links(product):
+    return {
+        'whatsapp': whatsapp_url(product.get_whatsapp_message()),
+        'mailto': mailto_url(product.get_email_recipient(), product.get_email_subject(), product.get_email_body()),
+    }
+
+
+def product_links(product):
+    """WhatsApp and mailto URLs of a product, memoized while the product is unchanged"""
+    if product.pk is None or product.updated_at is None:
+        return build_product_links(product)
+    key = (product.pk, product.updated_at)
+    with _product_links_lock:
+        links = _product_links.get(key)
+        if links is not None:
+            _product_links.move_to_end(key)
+            return links
+    links = build_product_links(product)
+    with _product_links_lock:
+        _product_links[key] = links
+        while len(_product_links) > PRODUCT_LINKS_CACHE_SIZE:
+            _product_links.popitem(last=False)
+    return links
+
+
+def clear_contact_caches():
+    whatsapp_number.cache_clear()
+    site_contact_context.cache_clear()
+    with _product_links_lock:
+        _product_links.clear()
+
+
+@receiver(setting_changed)
+def _contact_setting_changed(setting, **kwargs):
+    if setting in ('WHATSAPP_NUMBER', 'CONTACT_EMAIL'):
+        clear_contact_caches()
@@ -1,25 +1,103 @@
 from django.conf import settings
-import re
+from django.core.cache import cache
+from django.db import DatabaseError
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils.functional import SimpleLazyObject
+import hashlib
+import logging
+import time
+from .contacts import site_contact_context
 from .models import BackgroundImage
 
+logger = logging.getLogger(__name__)
+
+BACKGROUNDS_CACHE_KEY = 'sportova:backgrounds:compiled'
+# Django cache lifetime and how long each process trusts its in-memory copy
+BACKGROUNDS_CACHE_TIMEOUT = getattr(settings, 'SPORTOVA_BACKGROUNDS_CACHE_TIMEOUT', 60 * 60)
+BACKGROUNDS_LOCAL_TIMEOUT = getattr(settings, 'SPORTOVA_BACKGROUNDS_LOCAL_TIMEOUT', 30)
+
+_local_backgrounds = {'value': None, 'expires': 0.0}
+
 
 def site_contacts(request):
-    raw = getattr(settings, "WHATSAPP_NUMBER", "")
-    cleaned = re.sub(r"\D", "", raw)
+    """Contact email and WhatsApp number, cleaned once per process"""
+    return site_contact_context()
+
+
+def _load_backgrounds():
+    backgrounds = {}
+    for bg in BackgroundImage.objects.filter(is_active=True):
+        backgrounds[f'bg_{bg.section}'] = {
+            'name': bg.name,
+            'section': bg.section,
+            'image_url': bg.image.url,
+            'css': bg.get_css_background(),
+        }
+    return backgrounds
+
+
+def compile_background_stylesheet(backgrounds):
+    """The section background rules as one stylesheet, plus a content hash for its URL"""
+    css = render_to_string('sportova/backgrounds.css', {'backgrounds': backgrounds})
+    return css, hashlib.sha256(css.encode()).hexdigest()[:12]
+
+
+def _get_compiled_backgrounds(refresh=False):
+    """Active backgrounds and their compiled stylesheet, served from process memory, then the Django cache
+
+    refresh skips the in-memory copy, which can lag other processes by BACKGROUNDS_LOCAL_TIMEOUT.
+    """
+    now = time.monotonic()
+    if not refresh and _local_backgrounds['value'] is not None and _local_backgrounds['expires'] > now:
+        return _local_backgrounds['value']
+
+    compiled = cache.get(BACKGROUNDS_CACHE_KEY)
+    if compiled is None:
+        try:
+            backgrounds = _load_backgrounds()
+        except DatabaseError:
+            # Table doesn't exist yet (during migrations); don't cache the miss
+            logger.warning("Background images unavailable, rendering without them", exc_info=True)
+            return {'backgrounds': {}, 'stylesheet': compile_background_stylesheet({})}
+        compiled = {'backgrounds': backgrounds, 'stylesheet': compile_background_stylesheet(backgrounds)}
+        cache.set(BACKGROUNDS_CACHE_KEY, compiled, BACKGROUNDS_CACHE_TIMEOUT)
+
+    _local_backgrounds['value'] = compiled
+    _local_backgrounds['expires'] = now + BACKGROUNDS_LOCAL_TIMEOUT
+    return compiled
+
+
+def get_active_backgrounds():
+    """Active backgrounds keyed by 'bg_<section>'"""
+    return _get_compiled_backgrounds()['backgrounds']
+
+
+def get_background_stylesheet(refresh=False):
+    """(css, version) of the compiled background stylesheet"""
+    return _get_compiled_backgrounds(refresh)['stylesheet']
+
+
+def invalidate_backgrounds_cache():
+    _local_backgrounds['value'] = None
+    cache.delete(BACKGROUNDS_CACHE_KEY)
+
+
+def _background_stylesheet_url():
+    _, version = get_background_stylesheet()
+    return reverse('sportova:background_stylesheet', args=[version])
+
+
+def background_images(request):
+    """Make background images available in all templates, evaluated only when a template uses them"""
     return {
-        "CONTACT_EMAIL": getattr(settings, "CONTACT_EMAIL", ""),
-        "WHATSAPP_NUMBER": raw,
-        "WHATSAPP_NUMBER_CLEAN": cleaned,
+        'backgrounds': SimpleLazyObject(get_active_backgrounds),
+        'background_stylesheet_url': SimpleLazyObject(_background_stylesheet_url),
     }
 
 
-def background_images(request):
-    """Make background images available in all templates"""
-    backgrounds = {}
-    try:
-        for bg in BackgroundImage.objects.filter(is_active=True):
-            backgrounds[f'bg_{bg.section}'] = bg
-    except:
-        # Handle case when table doesn't exist yet (during migrations)
-        pass
-    return {'backgrounds': backgrounds}
+def catalog(request):
+    """Product card cache lifetime for the {% cache %} fragments in the product grids"""
+    return {
+        'product_card_cache_timeout': getattr(settings, 'SPORTOVA_PRODUCT_CARD_CACHE_TIMEOUT', 60 * 60 * 24),
+    }
@@ -0,0 +1,166 @@
+"""Faceted filtering for the product list
+
+Facet counts come from one grouped query over (category, size, price
+bucket, featured), cached per catalog version, so it is invalidated by the
+same signals as the page cache. Counts for any combination of filters are
+then worked out in Python from that summary instead of running one
+aggregate per facet.
+"""
+from collections import Counter
+from decimal import Decimal
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Case, CharField, Count, Q, Value, When
+from django.http import Http404
+
+from .cache import get_catalog_version
+
+# (key, label, lower bound inclusive, upper bound exclusive)
+PRICE_BUCKETS = [
+    ('under-25', 'Under $25', None, Decimal('25')),
+    ('25-50', '$25 - $50', Decimal('25'), Decimal('50')),
+    ('50-100', '$50 - $100', Decimal('50'), Decimal('100')),
+    ('100-200', '$100 - $200', Decimal('100'), Decimal('200')),
+    ('200-plus', '$200 & up', Decimal('200'), None),
+]
+PRICE_BUCKET_LABELS = {key: label for key, label, low, high in PRICE_BUCKETS}
+FACET_PARAMS = ('category', 'size', 'price', 'featured')
+NO_SIZE = 'N/A'
+
+
+def price_bucket_q(key):
+    _, _, low, high = next(bucket for bucket in PRICE_BUCKETS if bucket[0] == key)
+    q = Q()
+    if low is not None:
+        q &= Q(price__gte=low)
+    if high is not None:
+        q &= Q(price__lt=high)
+    return q
+
+
+def price_bucket_expression():
+    return Case(
+        *[When(price_bucket_q(key), then=Value(key)) for key, *_ in PRICE_BUCKETS],
+        output_field=CharField(),
+    )
+
+
+def get_facet_summary():
+    """[(category_id, size, price_bucket, is_featured, count)] for the whole catalog"""
+    from .models import Product
+
+    key = f'sportova:facets:{get_catalog_version()}'
+    summary = cache.get(key)
+    if summary is None:
+        rows = (
+            Product.objects.order_by()
+            .annotate(price_bucket=price_bucket_expression())
+            .values_list('category_id', 'size', 'price_bucket', 'is_featured')
+            .annotate(count=Count('id'))
+        )
+        summary = [tuple(row) for row in rows]
+        cache.set(key, summary, getattr(settings, 'SPORTOVA_CATALOG_CACHE_TIMEOUT', 60 * 60))
+    return summary
+
+
+class FacetFilters:
+    """Facet selections parsed from a query string"""
+
+    def __init__(self, params, categories):
+        self.category = None
+        category_slug = params.get('category')
+        if category_slug:
+            self.category = next((c for c in categories if c.slug == category_slug), None)
+            if self.category is None:
+                raise Http404('No Category matches the given query.')
+        self.size = params.get('size') or None
+        price = params.get('price')
+        self.price = price if price in PRICE_BUCKET_LABELS else None
+        self.featured = params.get('featured') == '1'
+
+    def as_params(self, **changes):
+        """Query parameters for the current selection with some facets changed (None removes one)"""
+        params = {
+            'category': self.category.slug if self.category else None,
+            'size': self.size,
+            'price': self.price,
+            'featured': '1' if self.featured else None,
+        }
+        params.update(changes)
+        return {name: value for name, value in params.items() if value}
+
+    def query_prefix(self, **changes):
+        """Query string prefix ("a=1&b=2&") for links such as pagination"""
+        query = urlencode(self.as_params(**changes))
+        return f'{query}&' if query else ''
+
+    def is_active(self):
+        return bool(self.as_params())
+
+    def apply(self, queryset):
+        if self.category:
+            queryset = queryset.filter(category=self.category)
+        if self.size:
+            queryset = queryset.filter(size=self.size)
+        if self.price:
+            queryset = queryset.filter(price_bucket_q(self.price))
+        if self.featured:
+            queryset = queryset.filter(is_featured=True)
+        return queryset
+
+    def matches(self, row, ignore=None):
+        category_id, size, price_bucket, is_featured, _ = row
+        return (
+            (ignore == 'category' or not self.category or category_id == self.category.pk)
+            and (ignore == 'size' or not self.size or size == self.size)
+            and (ignore == 'price' or not self.price or price_bucket == self.price)
+            and (ignore == 'featured' or not self.featured or is_featured)
+        )
+
+
+def facet_counts(summary, filters):
+    """Per-option counts; each facet is counted with every *other* selected filter applied"""
+    counts = {name: Counter() for name in FACET_PARAMS}
+    for row in summary:
+        category_id, size, price_bucket, is_featured, count = row
+        if filters.matches(row, ignore='category'):
+            counts['category'][category_id] += count
+        if filters.matches(row, ignore='size'):
+            counts['size'][size] += count
+        if filters.matches(row, ignore='price'):
+            counts['price'][price_bucket] += count
+        if filters.matches(row, ignore='featured') and is_featured:
+            counts['featured'][True] += count
+    return counts
+
+
+def build_facets(filters, categories):
+    """Facet options ready for the template: label, count, toggle url and active flag"""
+    counts = facet_counts(get_facet_summary(), filters)
+
+    def option(name, value, label, count, active):
+        params = filters.as_params(**{name: None if active else value})
+        return {'label': label, 'count': count, 'active': active, 'url': f'?{urlencode(params)}'}
+
+    category_options = [
+        option('category', category.slug, category.name, counts['category'][category.pk],
+               filters.category == category)
+        for category in categories
+    ]
+    size_options = [
+        option('size', size, size, count, size == filters.size)
+        for size, count in sorted(counts['size'].items())
+        if size != NO_SIZE
+    ]
+    price_options = [
+        option('price', key, label, counts['price'][key], key == filters.price)
+        for key, label, low, high in PRICE_BUCKETS
+    ]
+    return {
+        'category': [o for o in category_options if o['count'] or o['active']],
+        'size': [o for o in size_options if o['count'] or o['active']],
+        'price': [o for o in price_options if o['count'] or o['active']],
+        'featured': option('featured', '1', 'Featured only', counts['featured'][True], filters.featured),
+    }
@@ -0,0 +1,284 @@
+"""Responsive image derivatives
+
+Every uploaded image gets fixed-width variants stored next to the original
+("products/gallery/ball.jpg" -> "products/gallery/ball.640w.webp"), in each
+modern format Pillow can write plus a JPEG/PNG fallback. Uploads are queued
+as ImageVariantJob rows and built by `manage.py generate_image_variants`;
+templates use the tags in sportova_images to emit srcset/sizes for them.
+"""
+import hashlib
+import logging
+import os
+import re
+from concurrent.futures import as_completed
+from io import BytesIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db.models import Q
+from django.utils import timezone
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+logger = logging.getLogger(__name__)
+
+# Images narrower than a width are stored at their own size under that width's name
+VARIANT_WIDTHS = (320, 640, 960, 1280, 1920)
+VARIANT_QUALITY = {'avif': 55, 'webp': 80, 'jpeg': 82}
+FORMAT_EXTENSIONS = {'avif': 'avif', 'webp': 'webp', 'jpeg': 'jpg', 'png': 'png'}
+FORMAT_MIME_TYPES = {'avif': 'image/avif', 'webp': 'image/webp', 'jpeg': 'image/jpeg', 'png': 'image/png'}
+
+Image.init()
+# AVIF needs a Pillow build (or plugin) that can write it; WebP is built in
+MODERN_FORMATS = [fmt for fmt in ('avif', 'webp') if fmt.upper() in Image.SAVE]
+
+SOURCE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp', '.gif')
+VARIANT_NAME_RE = re.compile(r'\.\d+w\.(avif|webp|jpg|png)$')
+# Failed jobs are retried by later runs until they have failed this many times
+VARIANT_JOB_MAX_ATTEMPTS = getattr(settings, 'SPORTOVA_IMAGE_VARIANT_MAX_ATTEMPTS', 3)
+
+
+def fallback_format(name):
+    """Format for browsers without WebP/AVIF; PNG keeps transparency"""
+    return 'png' if name.lower().endswith('.png') else 'jpeg'
+
+
+def variant_formats(name):
+    return [*MODERN_FORMATS, fallback_format(name)]
+
+
+def variant_name(name, width, fmt):
+    root, _ = os.path.splitext(name)
+    return f'{root}.{width}w.{FORMAT_EXTENSIONS[fmt]}'
+
+
+def _cache_key(name):
+    return f'sportova:image-variants:{name}'
+
+
+def available_formats(field_file, refresh=False):
+    """Formats whose variants exist for this file; checked on storage once, then cached"""
+    if not field_file:
+        return []
+    formats = None if refresh else cache.get(_cache_key(field_file.name))
+    if formats is None:
+        storage = field_file.storage
+        formats = [
+            fmt for fmt in variant_formats(field_file.name)
+            if storage.exists(variant_name(field_file.name, VARIANT_WIDTHS[0], fmt))
+        ]
+        cache.set(_cache_key(field_file.name), formats, 24 * 60 * 60)
+    return formats
+
+
+def _encode(image, fmt):
+    if fmt == 'jpeg' and image.mode != 'RGB':
+        image = image.convert('RGB')
+    elif image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'transparency' in image.info or image.mode in ('LA', 'PA') else 'RGB')
+    buffer = BytesIO()
+    options = {'optimize': True} if fmt in ('jpeg', 'png') else {}
+    if fmt in VARIANT_QUALITY:
+        options['quality'] = VARIANT_QUALITY[fmt]
+    image.save(buffer, fmt.upper(), **options)
+    return buffer.getvalue()
+
+
+def write_variants(storage, name, data=None):
+    """Write every width/format variant of a stored image; returns the names written"""
+    if data is None:
+        with storage.open(name, 'rb') as f:
+            data = f.read()
+    image = ImageOps.exif_transpose(Image.open(BytesIO(data)))
+    image.load()
+
+    written = []
+    # Largest first so each step downsamples the previous, smaller image
+    for width in sorted(VARIANT_WIDTHS, reverse=True):
+        if width < image.width:
+            image = image.resize((width, max(1, round(image.height * width / image.width))), Image.LANCZOS)
+        for fmt in variant_formats(name):
+            target = variant_name(name, width, fmt)
+            if storage.exists(target):
+                storage.delete(target)
+            written.append(storage.save(target, ContentFile(_encode(image, fmt))))
+    return written
+
+
+def forget_variants(name):
+    """Drop the cached format list so the next render checks storage again"""
+    cache.delete(_cache_key(name))
+
+
+def process_image(name, known_hash='', force=False):
+    """Worker-process entry point for generate_image_variants; never touches the database
+
+    Returns (name, status, source_hash, source_mtime, variant_count, error)
+    where status is 'done', 'unchanged' or 'failed'.
+    """
+    try:
+        source_mtime = default_storage.get_modified_time(name).timestamp()
+        with default_storage.open(name, 'rb') as f:
+            data = f.read()
+        source_hash = hashlib.sha256(data).hexdigest()
+        unchanged = source_hash == known_hash and default_storage.exists(
+            variant_name(name, VARIANT_WIDTHS[0], fallback_format(name))
+        )
+        if unchanged and not force:
+            return name, 'unchanged', source_hash, source_mtime, 0, ''
+        written = write_variants(default_storage, name, data)
+        return name, 'done', source_hash, source_mtime, len(written), ''
+    except (OSError, UnidentifiedImageError, Image.DecompressionBombError) as e:
+        return name, 'failed', '', None, 0, f'{type(e).__name__}: {e}'
+
+
+def image_field_names():
+    """Storage names referenced by every ImageField in the sportova app"""
+    from django.apps import apps
+    from django.db.models import ImageField
+
+    names = set()
+    for model in apps.get_app_config('sportova').get_models():
+        for field in model._meta.get_fields():
+            if isinstance(field, ImageField):
+                names.update(model.objects.values_list(field.name, flat=True))
+    names.discard('')
+    names.discard(None)
+    return names
+
+
+def enqueue_variants(field_file):
+    """Queue an uploaded file for the generate_image_variants worker
+
+    Files already known are left alone: uploads always get a fresh name, and
+    originals changed in place are picked up by the worker's mtime/hash scan.
+    """
+    from .models import ImageVariantJob
+
+    if field_file:
+        ImageVariantJob.objects.get_or_create(name=field_file.name)
+
+
+def media_image_names():
+    """Storage names of every original image under MEDIA_ROOT, skipping generated variants"""
+    names = set()
+    for directory, _, files in os.walk(settings.MEDIA_ROOT):
+        for filename in files:
+            if filename.lower().endswith(SOURCE_EXTENSIONS) and not VARIANT_NAME_RE.search(filename):
+                path = os.path.relpath(os.path.join(directory, filename), settings.MEDIA_ROOT)
+                names.add(path.replace(os.sep, '/'))
+    return names
+
+
+def scan_images(force=False):
+    """Sync ImageVariantJob rows with the images on disk and in ImageFields
+
+    New images are queued, finished jobs whose original changed on disk (or
+    whose variants were removed) are re-queued, and jobs for deleted originals
+    are dropped. Returns counts of queued, requeued and removed jobs.
+    """
+    from .models import ImageVariantJob
+
+    on_disk = media_image_names()
+    existing = on_disk | {name for name in image_field_names() - on_disk if default_storage.exists(name)}
+    jobs = {
+        name: (status, source_mtime)
+        for name, status, source_mtime in ImageVariantJob.objects.values_list('name', 'status', 'source_mtime')
+    }
+
+    new = sorted(existing - jobs.keys())
+    ImageVariantJob.objects.bulk_create(
+        [ImageVariantJob(name=name) for name in new], batch_size=500, ignore_conflicts=True
+    )
+    gone = sorted(jobs.keys() - existing)
+    stale = [
+        name for name, (status, source_mtime) in jobs.items()
+        if status == 'done' and name in existing and (
+            force
+            or default_storage.get_modified_time(name).timestamp() != source_mtime
+            or not default_storage.exists(variant_name(name, VARIANT_WIDTHS[0], fallback_format(name)))
+        )
+    ]
+    # Chunked so the IN lists stay under SQLite's bound-parameter limit
+    for i in range(0, max(len(gone), len(stale)), 500):
+        ImageVariantJob.objects.filter(name__in=gone[i:i + 500]).delete()
+        ImageVariantJob.objects.filter(name__in=stale[i:i + 500]).update(status='pending', attempts=0)
+    return {'queued': len(new), 'requeued': len(stale), 'removed': len(gone)}
+
+
+def _record_result(job, result):
+    from .models import ImageVariantJob
+
+    name, status, source_hash, source_mtime, variant_count, error = result
+    if status == 'failed':
+        logger.warning(f"Could not create image variants for {name}: {error}")
+        ImageVariantJob.objects.filter(pk=job.pk).update(
+            status='failed', attempts=job.attempts + 1, last_error=error
+        )
+        return
+    fields = {'status': 'done', 'source_mtime': source_mtime, 'attempts': job.attempts + 1, 'last_error': ''}
+    if status == 'done':
+        fields.update(source_hash=source_hash, variant_count=variant_count)
+        forget_variants(name)
+    ImageVariantJob.objects.filter(pk=job.pk).update(**fields)
+
+
+def process_variant_jobs(executor=None, batch_size=100, force=False):
+    """Build variants for every pending (or retryable failed) job; returns counts by outcome
+
+    Images are decoded, resized and encoded by `executor`'s worker processes,
+    or inline when there is none; this process only reads and updates rows.
+    Results are recorded as each image finishes, so an interrupted run
+    resumes where it stopped.
+    """
+    from .models import ImageVariantJob
+
+    results = {'done': 0, 'unchanged': 0, 'failed': 0}
+    done_names = []
+    due = Q(status='pending') | Q(status='failed', attempts__lt=VARIANT_JOB_MAX_ATTEMPTS)
+    last_pk = 0
+    while True:
+        # Walk by primary key so a job failing again isn't retried within the same run
+        jobs = list(ImageVariantJob.objects.filter(due, pk__gt=last_pk).order_by('pk')[:batch_size])
+        if not jobs:
+            break
+        last_pk = jobs[-1].pk
+        if executor is None:
+            outcomes = ((job, process_image(job.name, job.source_hash, force)) for job in jobs)
+        else:
+            futures = {executor.submit(process_image, job.name, job.source_hash, force): job for job in jobs}
+            outcomes = ((futures[future], future.result()) for future in as_completed(futures))
+        for job, result in outcomes:
+            _record_result(job, result)
+            results[result[1]] += 1
+            if result[1] == 'done':
+                done_names.append(job.name)
+
+    if results['done']:
+        from .cache import bump_catalog_version
+        from .context_processors import invalidate_backgrounds_cache
+        from .models import Product
+
+        # Pages, product cards and background CSS rendered meanwhile point at the originals
+        bump_catalog_version()
+        invalidate_backgrounds_cache()
+        now = timezone.now()
+        for i in range(0, len(done_names), 500):
+            Product.objects.filter(images__image__in=done_names[i:i + 500]).update(updated_at=now)
+    return results
+
+
+def variant_url(field_file, width=VARIANT_WIDTHS[-1]):
+    """URL of one variant in the best available format, or of the original if there are none"""
+    formats = available_formats(field_file)
+    if not formats:
+        return field_file.url
+    return field_file.storage.url(variant_name(field_file.name, width, formats[0]))
+
+
+def srcset(field_file, fmt):
+    return ', '.join(
+        f'{field_file.storage.url(variant_name(field_file.name, width, fmt))} {width}w'
+        for width in VARIANT_WIDTHS
+    )
@@ -0,0 +1,250 @@
+"""Per-request query and latency instrumentation
+
+RequestTimingMiddleware measures, for every request, the number of database
+queries and the time spent in them, the time spent rendering templates (with
+the TimedDjangoTemplates backend configured in TEMPLATES) and the total time.
+The numbers are sent back as a Server-Timing header, logged as one
+structured line and aggregated per URL name in process memory (see
+get_request_stats). Views with an entry in SPORTOVA_QUERY_BUDGETS that run
+more queries than allowed are logged, or raise QueryBudgetExceeded when
+SPORTOVA_QUERY_BUDGET_ACTION is 'raise' (handy in tests).
+
+TemplateProfiler breaks the template time down per template name, for the
+profile_templates command.
+"""
+import bisect
+import contextvars
+import logging
+import threading
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.template.backends.django import DjangoTemplates, Template as BackendTemplate
+from django.template.base import Template as EngineTemplate
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open-ended
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+_current = contextvars.ContextVar('sportova_request_timing', default=None)
+_stats_lock = threading.Lock()
+request_stats = {}
+
+
+class QueryBudgetExceeded(AssertionError):
+    """A view ran more database queries than its SPORTOVA_QUERY_BUDGETS entry allows"""
+
+
+class RequestTiming:
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.template_depth = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        # Database execute_wrapper: time every query run while the request is active
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - start
+            self.queries += 1
+
+
+class TimedTemplate(BackendTemplate):
+    def render(self, context=None, request=None):
+        timing = _current.get()
+        # Includes and lazily rendered fragments are counted within the outermost render
+        if timing is None or timing.template_depth:
+            return super().render(context, request)
+        timing.template_depth += 1
+        start = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            timing.template_time += time.perf_counter() - start
+            timing.template_depth -= 1
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """DjangoTemplates backend whose renders count towards the current request's template time"""
+
+    def from_string(self, template_code):
+        return TimedTemplate(super().from_string(template_code).template, self)
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name).template, self)
+
+
+def record_request(url_name, timing, total):
+    """Add one request to the in-memory per-URL-name aggregates"""
+    total_ms = total * 1000
+    with _stats_lock:
+        stats = request_stats.setdefault(url_name, {
+            'count': 0, 'total_ms': 0.0, 'db_ms': 0.0, 'template_ms': 0.0,
+            'queries': 0, 'max_queries': 0, 'buckets': [0] * (len(LATENCY_BUCKETS_MS) + 1),
+        })
+        stats['count'] += 1
+        stats['total_ms'] += total_ms
+        stats['db_ms'] += timing.db_time * 1000
+        stats['template_ms'] += timing.template_time * 1000
+        stats['queries'] += timing.queries
+        stats['max_queries'] = max(stats['max_queries'], timing.queries)
+        stats['buckets'][bisect.bisect_left(LATENCY_BUCKETS_MS, total_ms)] += 1
+
+
+def get_request_stats():
+    """Request count, mean timings, query counts and latency histogram per URL name for this process"""
+    with _stats_lock:
+        snapshot = {name: {**stats, 'buckets': list(stats['buckets'])} for name, stats in request_stats.items()}
+    result = {}
+    for name, stats in sorted(snapshot.items()):
+        count = stats['count']
+        result[name] = {
+            'count': count,
+            'mean_ms': stats['total_ms'] / count,
+            'mean_db_ms': stats['db_ms'] / count,
+            'mean_template_ms': stats['template_ms'] / count,
+            'mean_queries': stats['queries'] / count,
+            'max_queries': stats['max_queries'],
+            'histogram': dict(zip([*(f'<={bound}ms' for bound in LATENCY_BUCKETS_MS), 'inf'], stats['buckets'])),
+        }
+    return result
+
+
+def reset_request_stats():
+    with _stats_lock:
+        request_stats.clear()
+
+
+def check_query_budget(url_name, queries):
+    budget = getattr(settings, 'SPORTOVA_QUERY_BUDGETS', {}).get(url_name)
+    if budget is None or queries <= budget:
+        return
+    message = f"{url_name} ran {queries} queries, over its budget of {budget}"
+    if getattr(settings, 'SPORTOVA_QUERY_BUDGET_ACTION', 'warn') == 'raise':
+        raise QueryBudgetExceeded(message)
+    logger.warning(message, extra={'url_name': url_name, 'queries': queries, 'query_budget': budget})
+
+
+class TemplateProfiler:
+    """Count renders and measure total and self time per template name while active
+
+    Total time includes the templates a template includes or extends; self
+    time excludes them. Patches the engine for the duration of the block, so
+    use it from commands and tests, not in a serving process.
+    """
+
+    def __init__(self):
+        self.stats = {}
+        self._children = []
+
+    def __enter__(self):
+        original = EngineTemplate._render
+
+        def profiled_render(template, context):
+            self._children.append(0.0)
+            start = time.perf_counter()
+            try:
+                return original(template, context)
+            finally:
+                elapsed = time.perf_counter() - start
+                children = self._children.pop()
+                if self._children:
+                    self._children[-1] += elapsed
+                stats = self.stats.setdefault(template.name or '<string>', {'calls': 0, 'total': 0.0, 'self': 0.0})
+                stats['calls'] += 1
+                stats['total'] += elapsed
+                stats['self'] += elapsed - children
+
+        self._original = original
+        EngineTemplate._render = profiled_render
+        return self
+
+    def __exit__(self, *exc_info):
+        EngineTemplate._render = self._original
+
+    def reset(self):
+        self.stats = {}
+
+
+class RequestTimingMiddleware:
+    """Measure queries, DB time, template time and total time of each request
+
+    Put it first in MIDDLEWARE so the total covers the rest of the stack.
+    Works under WSGI and ASGI without forcing async views onto a thread.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timing = RequestTiming()
+        token = _current.set(timing)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                self.wrap_connections(stack, timing)
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, timing, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        timing = RequestTiming()
+        token = _current.set(timing)
+        start = time.perf_counter()
+        stack = ExitStack()
+        try:
+            # The async ORM runs queries in the request's thread-sensitive executor, whose
+            # connections are not the ones in this thread; wrap those instead
+            await sync_to_async(self.wrap_connections)(stack, timing)
+            try:
+                response = await self.get_response(request)
+            finally:
+                await sync_to_async(stack.close)()
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, timing, time.perf_counter() - start)
+
+    @staticmethod
+    def wrap_connections(stack, timing):
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(timing))
+
+    def finish(self, request, response, timing, total):
+        match = request.resolver_match
+        url_name = match.view_name if match else 'unresolved'
+        record_request(url_name, timing, total)
+        if getattr(settings, 'SPORTOVA_SERVER_TIMING', True):
+            response['Server-Timing'] = (
+                f'db;dur={timing.db_time * 1000:.1f};desc="{timing.queries} queries", '
+                f'tpl;dur={timing.template_time * 1000:.1f}, '
+                f'total;dur={total * 1000:.1f}'
+            )
+        logger.info(
+            "Request timing",
+            extra={
+                'url_name': url_name,
+                'method': request.method,
+                'status': response.status_code,
+                'queries': timing.queries,
+                'db_ms': round(timing.db_time * 1000, 2),
+                'template_ms': round(timing.template_time * 1000, 2),
+                'total_ms': round(total * 1000, 2),
+            },
+        )
+        check_query_budget(url_name, timing.queries)
+        return response
@@ -0,0 +1,139 @@
+import logging
+import smtplib
+import threading
+import time
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.template.loader import get_template
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# Errors meaning the connection itself is gone, so one reconnect is worth trying
+RECONNECT_ERRORS = (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError)
+
+
+class EmailConnectionPool:
+    """A single reusable email backend connection shared by a process
+
+    Messages are sent one at a time over the same open connection, so a batch
+    pays for one connect/TLS/login instead of one per message. The connection
+    is closed after `idle_timeout` seconds without use and reopened once when
+    the server has dropped it.
+    """
+
+    def __init__(self, idle_timeout=None, backend=None, **connection_kwargs):
+        if idle_timeout is None:
+            idle_timeout = getattr(settings, 'SPORTOVA_EMAIL_CONNECTION_IDLE_TIMEOUT', 30)
+        self.idle_timeout = idle_timeout
+        self.backend = backend
+        self.connection_kwargs = connection_kwargs
+        self._connection = None
+        self._last_used = 0.0
+        self._lock = threading.Lock()
+
+    def _open(self):
+        if self._connection is not None and time.monotonic() - self._last_used > self.idle_timeout:
+            self._close()
+        if self._connection is None:
+            self._connection = get_connection(self.backend, fail_silently=False, **self.connection_kwargs)
+            self._connection.open()
+        return self._connection
+
+    def _close(self):
+        if self._connection is not None:
+            try:
+                self._connection.close()
+            except Exception:
+                logger.debug("Ignoring error while closing email connection", exc_info=True)
+            self._connection = None
+
+    def close(self):
+        with self._lock:
+            self._close()
+
+    def _send_one(self, message):
+        try:
+            self._open().send_messages([message])
+        except RECONNECT_ERRORS as e:
+            logger.warning(f"Email connection lost ({e}), reconnecting")
+            self._close()
+            self._open().send_messages([message])
+        self._last_used = time.monotonic()
+
+    def send_messages(self, messages):
+        """Send messages over the shared connection; returns a list of (message, error) pairs"""
+        results = []
+        with self._lock:
+            for message in messages:
+                try:
+                    self._send_one(message)
+                except Exception as e:
+                    # Leave the connection in a known state for the next message
+                    self._close()
+                    results.append((message, e))
+                else:
+                    results.append((message, None))
+        return results
+
+
+email_pool = EmailConnectionPool()
+
+
+class EmailRenderer:
+    """Renders the HTML and text variants of an email from one shared context
+
+    Templates come from the cached template loader configured in TEMPLATES,
+    so each is compiled once per process. Render times are accumulated per
+    template in `timings`.
+    """
+
+    TEMPLATES = {
+        'contact_notification': ('emails/contact_notification.html', 'emails/contact_notification.txt'),
+        'contact_confirmation': ('emails/contact_confirmation.html', 'emails/contact_confirmation.txt'),
+        'reply': ('emails/reply_email.html', 'emails/reply_email.txt'),
+    }
+
+    def __init__(self):
+        self.timings = {}
+
+    def clear(self):
+        self.timings.clear()
+
+    def base_context(self):
+        return {
+            'current_year': timezone.now().year,
+            'whatsapp_number': settings.WHATSAPP_NUMBER,
+            'contact_email': settings.CONTACT_EMAIL,
+        }
+
+    def _render(self, name, context):
+        start = time.perf_counter()
+        content = get_template(name).render(context)
+        elapsed = time.perf_counter() - start
+        count, total = self.timings.get(name, (0, 0.0))
+        self.timings[name] = (count + 1, total + elapsed)
+        return content, elapsed
+
+    def render(self, kind, **context):
+        """Return (html, text) for an email kind, rendered from one shared context"""
+        html_name, text_name = self.TEMPLATES[kind]
+        context = {**self.base_context(), **context}
+        html_content, html_time = self._render(html_name, context)
+        text_content, text_time = self._render(text_name, context)
+        logger.debug(
+            "Rendered email templates",
+            extra={'email_kind': kind, 'html_ms': html_time * 1000, 'text_ms': text_time * 1000},
+        )
+        return html_content, text_content
+
+    def stats(self):
+        """Render count, total and mean milliseconds per template"""
+        return {
+            name: {'count': count, 'total_ms': total * 1000, 'mean_ms': total * 1000 / count}
+            for name, (count, total) in self.timings.items()
+        }
+
+
+email_renderer = EmailRenderer()
@@ -0,0 +1,116 @@
+import asyncio
+import threading
+import time
+import types
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import ThreadSensitiveContext
+from django.core.management.base import BaseCommand, CommandError
+from django.test import AsyncClient, Client, override_settings
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.urls import include, path
+from sportova.management.commands.benchmark_views import storefront_urls
+
+
+def storefront_urlconf(module):
+    """A root URLconf serving only the storefront from `module` (sportova.urls or sportova.async_urls)"""
+    urlconf = types.ModuleType(f'{module}_root')
+    urlconf.urlpatterns = [path('', include(module))]
+    return urlconf
+
+
+# (label, handler, storefront URL module)
+MODES = [
+    ('wsgi', 'wsgi', 'sportova.urls'),
+    ('asgi', 'asgi', 'sportova.urls'),
+    ('asgi+async', 'asgi', 'sportova.async_urls'),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare requests/sec for every storefront URL under WSGI with the sync views, '
+        'and under ASGI with the sync and the async views, on the current database. '
+        'Requests go through the in-process test clients, so no server or network is involved'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Timed requests per URL and mode')
+        parser.add_argument('--concurrency', type=int, default=8,
+                            help='Requests in flight: threads for WSGI, tasks for ASGI')
+        parser.add_argument('--warmup', type=int, default=2, help='Untimed requests per URL and mode')
+        parser.add_argument('--with-cache', action='store_true',
+                            help='Keep the catalog page cache enabled (measures cache hits instead of renders)')
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1 or options['concurrency'] < 1:
+            raise CommandError('--requests and --concurrency must be at least 1')
+        urls = storefront_urls()
+        results = {}
+        setup_test_environment()
+        try:
+            for label, handler, module in MODES:
+                with override_settings(
+                    ROOT_URLCONF=storefront_urlconf(module),
+                    SPORTOVA_CATALOG_CACHE_ENABLED=options['with_cache'],
+                ):
+                    for view, url in urls:
+                        if handler == 'wsgi':
+                            rate = self.run_wsgi(url, options)
+                        else:
+                            rate = asyncio.run(self.run_asgi(url, options))
+                        results[view, label] = rate
+        finally:
+            teardown_test_environment()
+        self.report(urls, results)
+
+    def run_wsgi(self, url, options):
+        local = threading.local()
+
+        def get(_):
+            if not hasattr(local, 'client'):
+                local.client = Client()
+            return local.client.get(url).status_code
+
+        for _ in range(options['warmup']):
+            self._check_status(url, get(None))
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as executor:
+            start = time.perf_counter()
+            statuses = list(executor.map(get, range(options['requests'])))
+            elapsed = time.perf_counter() - start
+        for status in statuses:
+            self._check_status(url, status)
+        return options['requests'] / elapsed
+
+    async def run_asgi(self, url, options):
+        client = AsyncClient()
+
+        async def get():
+            # Like ASGIHandler, give each request its own thread for the sync parts of the stack
+            async with ThreadSensitiveContext():
+                self._check_status(url, (await client.get(url)).status_code)
+
+        for _ in range(options['warmup']):
+            await get()
+        remaining = options['requests']
+
+        async def worker():
+            nonlocal remaining
+            while remaining > 0:
+                remaining -= 1
+                await get()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(options['concurrency'])))
+        return options['requests'] / (time.perf_counter() - start)
+
+    @staticmethod
+    def _check_status(url, status):
+        if status != 200:
+            raise CommandError(f'{url} returned {status}')
+
+    def report(self, urls, results):
+        labels = [label for label, _, _ in MODES]
+        self.stdout.write(f"{'view':<28}" + ''.join(f'{label + " req/s":>18}' for label in labels))
+        for view, _ in urls:
+            self.stdout.write(f'{view:<28}' + ''.join(f'{results[view, label]:>18.1f}' for label in labels))
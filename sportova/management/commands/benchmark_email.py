@@ -0,0 +1,102 @@
+import socketserver
+import threading
+import time
+
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.core.management.base import BaseCommand
+from sportova.mail import EmailConnectionPool
+
+SMTP_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+
+
+class SMTPSinkHandler(socketserver.StreamRequestHandler):
+    """Minimal SMTP server that accepts and discards every message"""
+
+    def reply(self, line):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        # Stand-in for TCP/TLS handshake and login cost on a real server
+        time.sleep(self.server.connect_latency)
+        self.reply('220 sportova-benchmark ESMTP')
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode(errors='replace').strip().upper()
+            if command.startswith('EHLO'):
+                self.reply('250-sportova-benchmark')
+                self.reply('250 8BITMIME')
+            elif command.startswith('DATA'):
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                while self.rfile.readline() not in (b'.\r\n', b''):
+                    pass
+                self.server.received += 1
+                self.reply('250 OK')
+            elif command.startswith('QUIT'):
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('250 OK')
+
+
+class SMTPSink(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, connect_latency):
+        super().__init__(('127.0.0.1', 0), SMTPSinkHandler)
+        self.connect_latency = connect_latency
+        self.received = 0
+
+
+class Command(BaseCommand):
+    help = 'Compare messages/sec for per-message SMTP connections and the pooled connection against a local SMTP sink'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--messages', type=int, default=200)
+        parser.add_argument('--connect-latency', type=float, default=20.0,
+                            help='Milliseconds the sink waits before greeting each new connection')
+
+    def build_messages(self, count):
+        messages = []
+        for i in range(count):
+            message = EmailMultiAlternatives(
+                subject=f'Benchmark {i}', body='Plain body', from_email='bench@sportova.local', to=[f'user{i}@example.com']
+            )
+            message.attach_alternative('<p>HTML body</p>', 'text/html')
+            messages.append(message)
+        return messages
+
+    def report(self, label, count, elapsed):
+        self.stdout.write(f"{label:<28} {count} messages in {elapsed:.2f}s = {count / elapsed:,.1f} msg/s")
+
+    def handle(self, *args, **options):
+        count = options['messages']
+        server = SMTPSink(options['connect_latency'] / 1000)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        host, port = server.server_address
+        connection_kwargs = {'host': host, 'port': port, 'username': '', 'password': '', 'use_tls': False, 'use_ssl': False}
+
+        try:
+            messages = self.build_messages(count)
+            start = time.perf_counter()
+            for message in messages:
+                # What EmailMessage.send() does: a fresh connection per message
+                get_connection(SMTP_BACKEND, **connection_kwargs).send_messages([message])
+            self.report('connection per message', count, time.perf_counter() - start)
+
+            pool = EmailConnectionPool(backend=SMTP_BACKEND, **connection_kwargs)
+            messages = self.build_messages(count)
+            start = time.perf_counter()
+            results = pool.send_messages(messages)
+            elapsed = time.perf_counter() - start
+            pool.close()
+            failures = sum(1 for _, error in results if error is not None)
+            self.report('pooled connection', count, elapsed)
+            if failures:
+                self.stdout.write(self.style.WARNING(f"{failures} pooled sends failed"))
+            self.stdout.write(f"Sink received {server.received} messages")
+        finally:
+            server.shutdown()
+            server.server_close()
@@ -0,0 +1,76 @@
+import statistics
+import time
+from urllib.parse import urlencode
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext, setup_test_environment, teardown_test_environment
+from django.urls import reverse
+from sportova.models import Category, Product
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def storefront_urls():
+    """(label, url) for every storefront view, using real rows from the current database"""
+    product = Product.objects.order_by('pk').first()
+    category = Category.objects.order_by('-product_count').first()
+    if product is None or category is None:
+        raise CommandError('No catalog data; run generate_catalog first')
+    last_page = max(1, (Product.objects.count() + 8) // 9)
+    return [
+        ('home', reverse('sportova:home')),
+        ('product_list', reverse('sportova:product_list')),
+        ('product_list (last page)', f"{reverse('sportova:product_list')}?page={last_page}"),
+        ('product_list (category)', f"{reverse('sportova:product_list')}?category={category.slug}"),
+        ('product_detail', product.get_absolute_url()),
+        ('category_list', reverse('sportova:category_list')),
+        ('category_detail', category.get_absolute_url()),
+        ('search', f"{reverse('sportova:search')}?{urlencode({'q': product.name.split()[0]})}"),
+        ('shipment', reverse('sportova:shipment')),
+        ('contact', reverse('sportova:contact')),
+    ]
+
+
+class Command(BaseCommand):
+    help = 'Drive every storefront URL through the test client and report p50/p95 latency and query counts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=20, help='Timed requests per URL')
+        parser.add_argument('--warmup', type=int, default=2, help='Untimed requests per URL')
+        parser.add_argument('--with-cache', action='store_true',
+                            help='Keep the catalog page cache enabled (measures cache hits instead of renders)')
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        try:
+            with override_settings(SPORTOVA_CATALOG_CACHE_ENABLED=options['with_cache']):
+                self.run(options)
+        finally:
+            teardown_test_environment()
+
+    def run(self, options):
+        client = Client()
+        self.stdout.write(f"{'view':<28} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8} {'queries':>8}")
+        for label, url in storefront_urls():
+            for _ in range(options['warmup']):
+                client.get(url)
+            timings = []
+            queries = []
+            for _ in range(options['requests']):
+                with CaptureQueriesContext(connection) as captured:
+                    start = time.perf_counter()
+                    response = client.get(url)
+                    timings.append((time.perf_counter() - start) * 1000)
+                queries.append(len(captured))
+                if response.status_code != 200:
+                    raise CommandError(f'{url} returned {response.status_code}')
+            self.stdout.write(
+                f"{label:<28} {statistics.median(timings):>8.1f} {percentile(timings, 95):>8.1f} "
+                f"{max(timings):>8.1f} {max(queries):>8}"
+            )
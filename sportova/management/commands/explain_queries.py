@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext, setup_test_environment, teardown_test_environment
+
+from .benchmark_views import storefront_urls
+
+
+class Command(BaseCommand):
+    help = "Print the database's query plan for every SELECT each storefront view runs"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--view', action='append', help='Only explain these view labels (repeatable)')
+        parser.add_argument('--analyze', action='store_true', help='EXPLAIN ANALYZE (PostgreSQL only; executes the query)')
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        try:
+            # Render for real; a cached page would run no queries to explain
+            with override_settings(SPORTOVA_CATALOG_CACHE_ENABLED=False):
+                self.explain_views(options)
+        finally:
+            teardown_test_environment()
+
+    def explain_prefix(self, analyze):
+        if connection.vendor == 'sqlite':
+            return 'EXPLAIN QUERY PLAN'
+        if analyze and connection.vendor == 'postgresql':
+            return 'EXPLAIN (ANALYZE, BUFFERS)'
+        return connection.ops.explain_query_prefix()
+
+    def explain_views(self, options):
+        client = Client()
+        prefix = self.explain_prefix(options['analyze'])
+        for label, url in storefront_urls():
+            if options['view'] and label not in options['view']:
+                continue
+            with CaptureQueriesContext(connection) as captured:
+                client.get(url)
+            self.stdout.write(self.style.MIGRATE_HEADING(f"{label}  {url}  ({len(captured)} queries)"))
+            for query in captured:
+                sql = query['sql']
+                if not sql.lstrip().upper().startswith('SELECT'):
+                    continue
+                self.stdout.write(self.style.SQL_KEYWORD(sql))
+                with connection.cursor() as cursor:
+                    cursor.execute(f"{prefix} {sql}")
+                    for row in cursor.fetchall():
+                        self.stdout.write('    ' + '  '.join(str(column) for column in row))
+                self.stdout.write('')
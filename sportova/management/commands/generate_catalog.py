@@ -0,0 +1,124 @@
+import random
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from sportova.cache import bump_catalog_version
+from sportova.models import Category, ContactMessage, Product, ProductImage
+from sportova.search import rebuild_search_index
+from sportova.slugs import allocate_slugs
+
+SKU_PREFIX = 'SYN-'
+SPORTS = ['Football', 'Cricket', 'Hockey', 'Tennis', 'Basketball', 'Running', 'Boxing', 'Swimming', 'Cycling', 'Rugby']
+KINDS = ['Ball', 'Gloves', 'Boots', 'Shirt', 'Shorts', 'Bag', 'Bottle', 'Cap', 'Socks', 'Shin Guards', 'Net', 'Cones']
+ADJECTIVES = ['Pro', 'Elite', 'Training', 'Match', 'Junior', 'Classic', 'Ultra', 'Premium', 'Lite', 'Club']
+SIZES = ['N/A', 'S', 'M', 'L', 'XL', '4', '5', '7', '8', '9', '10']
+WORDS = (
+    'durable lightweight grip breathable official approved premium synthetic leather padded '
+    'moisture wicking stitched reinforced comfortable professional training match weather'
+).split()
+
+
+class Command(BaseCommand):
+    help = 'Generate a deterministic synthetic catalog of any size for load testing'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--categories', type=int, default=20)
+        parser.add_argument('--products', type=int, default=1000)
+        parser.add_argument('--images', type=int, default=2, help='Images per product')
+        parser.add_argument('--messages', type=int, default=200, help='Contact messages')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--clear', action='store_true', help='Delete existing catalog and messages first')
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        batch_size = options['batch_size']
+        start = time.perf_counter()
+
+        with transaction.atomic():
+            if options['clear']:
+                self.stdout.write('Clearing existing data...')
+                self.clear()
+            first_sku = self.next_sku_index()
+
+            self.stdout.write(f"Creating {options['categories']} categories...")
+            names = [self.category_name(i) for i in range(options['categories'])]
+            Category.objects.bulk_create(
+                [Category(name=name, slug=slug) for name, slug in zip(names, allocate_slugs(Category, names))],
+                ignore_conflicts=True,
+            )
+            category_ids = list(Category.objects.filter(name__in=names).values_list('pk', flat=True))
+
+            self.stdout.write(f"Creating {options['products']} products...")
+            for offset in range(0, options['products'], batch_size):
+                count = min(batch_size, options['products'] - offset)
+                products = [self.product(rng, first_sku + offset + i, category_ids) for i in range(count)]
+                for product, slug in zip(products, allocate_slugs(Product, [p.name for p in products])):
+                    product.slug = slug
+                products = Product.objects.bulk_create(products)
+                ProductImage.objects.bulk_create([
+                    ProductImage(
+                        product=product,
+                        image=f'products/gallery/synthetic-{product.sku.lower()}-{n}.jpg',
+                        alt_text=product.name,
+                        is_primary=(n == 0),
+                    )
+                    for product in products
+                    for n in range(options['images'])
+                ])
+
+            self.stdout.write(f"Creating {options['messages']} contact messages...")
+            ContactMessage.objects.bulk_create(
+                [self.contact_message(rng, i) for i in range(options['messages'])],
+                batch_size=batch_size,
+            )
+
+            Category.objects.filter(pk__in=category_ids).refresh_product_counts()
+            rebuild_search_index()
+        bump_catalog_version()
+
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(f'Generated synthetic data in {elapsed:.2f}s'))
+
+    def clear(self):
+        """One DELETE per catalog table; the per-row signals are skipped since the counts and the
+        search index are rebuilt once at the end"""
+        with connection.cursor() as cursor:
+            for model in (ProductImage, Product, Category):
+                cursor.execute(f'DELETE FROM {connection.ops.quote_name(model._meta.db_table)}')
+        ContactMessage.objects.all().delete()
+
+    def next_sku_index(self):
+        """Synthetic SKUs continue after the highest existing one, so runs without --clear add products"""
+        last = (
+            Product.objects.filter(sku__range=(f'{SKU_PREFIX}0000000', f'{SKU_PREFIX}9999999'))
+            .order_by('-sku').values_list('sku', flat=True).first()
+        )
+        return int(last[len(SKU_PREFIX):]) + 1 if last else 0
+
+    def category_name(self, index):
+        sport = SPORTS[index % len(SPORTS)]
+        return sport if index < len(SPORTS) else f"{sport} {KINDS[index % len(KINDS)]} {index}"
+
+    def product(self, rng, index, category_ids):
+        name = f"{rng.choice(ADJECTIVES)} {rng.choice(SPORTS)} {rng.choice(KINDS)}"
+        return Product(
+            category_id=rng.choice(category_ids),
+            name=name,
+            sku=f'{SKU_PREFIX}{index:07d}',
+            description=' '.join(rng.choices(WORDS, k=rng.randint(12, 40))).capitalize() + '.',
+            price=Decimal(rng.randint(500, 25000)) / 100,
+            size=rng.choice(SIZES),
+            is_featured=rng.random() < 0.1,
+        )
+
+    def contact_message(self, rng, index):
+        return ContactMessage(
+            name=f'Customer {index}',
+            email=f'customer{index}@example.com',
+            subject=f"Question about {rng.choice(KINDS).lower()}",
+            message=' '.join(rng.choices(WORDS, k=rng.randint(10, 60))),
+            status=rng.choice(['new', 'new', 'in_progress', 'closed']),
+        )
@@ -0,0 +1,61 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connections
+from sportova.images import process_variant_jobs, scan_images
+
+
+class Command(BaseCommand):
+    help = 'Build responsive image variants for queued uploads, optionally backfilling every existing image'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scan', action='store_true',
+            help='Queue every image in MEDIA_ROOT and ImageFields whose variants are missing or out of date'
+        )
+        parser.add_argument('--force', action='store_true', help='Rebuild variants even when the original is unchanged')
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count() or 1,
+            help='Worker processes (default: all cores); 1 builds variants in this process'
+        )
+        parser.add_argument('--batch-size', type=int, default=100, help='Jobs handed to the workers per batch')
+        parser.add_argument('--interval', type=float, default=5.0, help='Seconds to sleep when the queue is empty')
+        parser.add_argument('--once', action='store_true', help='Drain the queue once and exit')
+
+    def handle(self, *args, **options):
+        if options['scan']:
+            counts = scan_images(force=options['force'])
+            self.stdout.write(
+                f"Queued {counts['queued']} new, requeued {counts['requeued']} changed, "
+                f"dropped {counts['removed']} deleted image(s)"
+            )
+
+        executor = None
+        if options['workers'] > 1:
+            # Children must not inherit this process's open database connections
+            connections.close_all()
+            executor = ProcessPoolExecutor(max_workers=options['workers'], initializer=django.setup)
+        try:
+            while True:
+                started = time.perf_counter()
+                results = process_variant_jobs(executor, options['batch_size'], force=options['force'])
+                processed = sum(results.values())
+                if processed:
+                    self.report(results, time.perf_counter() - started)
+                if options['once']:
+                    break
+                if processed == 0:
+                    time.sleep(options['interval'])
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+    def report(self, results, elapsed):
+        processed = sum(results.values())
+        self.stdout.write(
+            f"Built {results['done']}, unchanged {results['unchanged']}, failed {results['failed']} "
+            f"in {elapsed:.1f}s ({processed / elapsed:.1f} images/sec)"
+        )
@@ -0,0 +1,162 @@
+import csv
+import json
+import sys
+import time
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from sportova.cache import bump_catalog_version
+from sportova.models import Category, Product
+from sportova.search import index_products
+from sportova.slugs import allocate_slugs
+
+PRODUCT_UPDATE_FIELDS = ['category', 'name', 'description', 'price', 'size', 'is_featured', 'updated_at']
+TRUE_VALUES = {'1', 'true', 'yes', 'y'}
+
+
+def read_rows(stream, fmt):
+    """Yield one dict per input row without loading the whole file"""
+    if fmt == 'csv':
+        yield from csv.DictReader(stream)
+    else:
+        for line in stream:
+            if line.strip():
+                yield json.loads(line)
+
+
+def text(value):
+    """A stripped string, with JSON null and the None DictReader fills short rows with as empty"""
+    return '' if value is None else str(value).strip()
+
+
+def batched(rows, size):
+    rows = iter(rows)
+    while batch := list(islice(rows, size)):
+        yield batch
+
+
+class Command(BaseCommand):
+    help = (
+        'Upsert categories and products from a CSV or JSONL supplier feed. '
+        'Columns: sku, name, category, description, price, size, is_featured'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Feed file, or '-' for stdin")
+        parser.add_argument('--format', choices=['csv', 'jsonl'], help='Defaults to the file extension')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows upserted per transaction')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or ('jsonl' if path.endswith(('.jsonl', '.json')) else 'csv')
+        self.category_ids = {}
+        self.touched_categories = set()
+
+        start = time.perf_counter()
+        total = 0
+        stream = sys.stdin if path == '-' else open(path, newline='', encoding='utf-8')
+        try:
+            for batch in batched(read_rows(stream, fmt), options['batch_size']):
+                with transaction.atomic():
+                    total += self.import_batch(batch, total)
+                elapsed = time.perf_counter() - start
+                self.stdout.write(f"{total} rows imported ({total / elapsed:,.0f} rows/sec)")
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+            # bulk_create skips signals, so refresh what they would have maintained (the search
+            # index is refreshed per batch in import_batch). Also done when a bad row stops the
+            # import, since the batches before it are already committed.
+            Category.objects.filter(pk__in=self.touched_categories).refresh_product_counts()
+            bump_catalog_version()
+
+        elapsed = time.perf_counter() - start
+        rate = total / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(f"Imported {total} rows in {elapsed:.2f}s ({rate:,.0f} rows/sec)"))
+
+    def clean_row(self, row, line):
+        try:
+            sku = text(row['sku'])
+            name = text(row['name'])
+            category = text(row['category'])
+            price = row['price']
+        except KeyError as e:
+            raise CommandError(f"Row {line}: missing column {e}")
+        if not (sku and name and category):
+            raise CommandError(f"Row {line}: sku, name and category are required")
+        try:
+            price = Decimal(text(price))
+        except InvalidOperation:
+            raise CommandError(f"Row {line}: invalid price {price!r}")
+        return {
+            'sku': sku,
+            'name': name,
+            'category': category,
+            'description': row.get('description') or '',
+            'price': price,
+            'size': row.get('size') or 'N/A',
+            'is_featured': text(row.get('is_featured')).lower() in TRUE_VALUES,
+        }
+
+    def upsert_categories(self, names):
+        missing = sorted(set(names) - self.category_ids.keys())
+        if not missing:
+            return
+        existing = dict(Category.objects.filter(name__in=missing).values_list('name', 'pk'))
+        new_names = [name for name in missing if name not in existing]
+        if new_names:
+            Category.objects.bulk_create(
+                [Category(name=name, slug=slug) for name, slug in zip(new_names, allocate_slugs(Category, new_names))],
+                update_conflicts=True,
+                unique_fields=['name'],
+                update_fields=['updated_at'],
+            )
+            existing.update(Category.objects.filter(name__in=new_names).values_list('name', 'pk'))
+        self.category_ids.update(existing)
+
+    def import_batch(self, batch, offset):
+        # Later rows for the same SKU win, as they would with row-by-row saves
+        rows = {}
+        for line, row in enumerate(batch, start=offset + 1):
+            cleaned = self.clean_row(row, line)
+            rows[cleaned['sku']] = cleaned
+        rows = list(rows.values())
+
+        self.upsert_categories(row['category'] for row in rows)
+        existing_slugs = {}
+        for sku, slug, category_id in Product.objects.filter(
+            sku__in=[row['sku'] for row in rows]
+        ).values_list('sku', 'slug', 'category_id'):
+            existing_slugs[sku] = slug
+            # The product may move; its old category needs recounting too
+            self.touched_categories.add(category_id)
+        new_rows = [row for row in rows if row['sku'] not in existing_slugs]
+        new_slugs = dict(zip(
+            (row['sku'] for row in new_rows),
+            allocate_slugs(Product, [row['name'] for row in new_rows]),
+        ))
+
+        products = []
+        for row in rows:
+            category_id = self.category_ids[row['category']]
+            self.touched_categories.add(category_id)
+            products.append(Product(
+                sku=row['sku'],
+                slug=existing_slugs.get(row['sku']) or new_slugs[row['sku']],
+                category_id=category_id,
+                name=row['name'],
+                description=row['description'],
+                price=row['price'],
+                size=row['size'],
+                is_featured=row['is_featured'],
+            ))
+        Product.objects.bulk_create(
+            products,
+            update_conflicts=True,
+            unique_fields=['sku'],
+            update_fields=PRODUCT_UPDATE_FIELDS,
+        )
+        index_products(Product.objects.filter(sku__in=[row['sku'] for row in rows]).values_list('pk', flat=True))
+        return len(batch)
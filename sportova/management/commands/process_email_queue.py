@@ -0,0 +1,39 @@
+import time
+
+from django.core.management.base import BaseCommand
+from sportova.mail import email_pool, email_renderer
+from sportova.tasks import process_email_queue
+
+
+class Command(BaseCommand):
+    help = 'Send queued outbound emails, retrying failures with exponential backoff'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50, help='Emails claimed per batch')
+        parser.add_argument('--interval', type=float, default=5.0, help='Seconds to sleep when the queue is empty')
+        parser.add_argument('--once', action='store_true', help='Drain the due emails once and exit')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        while True:
+            results = process_email_queue(batch_size)
+            if any(results.values()):
+                self.stdout.write(
+                    f"Sent {results['sent']}, retrying {results['retry']}, dead-lettered {results['dead']}"
+                )
+            processed = sum(results.values())
+            if options['once'] and processed < batch_size:
+                break
+            if processed == 0:
+                # Don't hold an idle SMTP connection open while the queue is empty
+                email_pool.close()
+                time.sleep(options['interval'])
+        email_pool.close()
+        if options['verbosity'] > 1:
+            self.report_render_timings()
+
+    def report_render_timings(self):
+        for name, timing in sorted(email_renderer.stats().items()):
+            self.stdout.write(
+                f"{name}: {timing['count']} renders, {timing['mean_ms']:.2f}ms mean, {timing['total_ms']:.1f}ms total"
+            )
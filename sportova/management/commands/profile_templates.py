@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+from django.test.utils import setup_test_environment, teardown_test_environment
+from sportova.instrumentation import TemplateProfiler
+from sportova.management.commands.benchmark_views import storefront_urls
+
+
+class Command(BaseCommand):
+    help = 'Render every storefront URL and report render count, total and self time per template'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=10, help='Profiled requests per URL')
+        parser.add_argument('--warmup', type=int, default=1, help='Unprofiled requests per URL (fills the caches)')
+        parser.add_argument('--top', type=int, default=10, help='Templates listed per URL, slowest self time first')
+        parser.add_argument('--without-fragment-cache', action='store_true',
+                            help='Render every product card instead of serving it from the fragment cache')
+
+    def handle(self, *args, **options):
+        overrides = {'SPORTOVA_CATALOG_CACHE_ENABLED': False}
+        if options['without_fragment_cache']:
+            overrides['SPORTOVA_PRODUCT_CARD_CACHE_TIMEOUT'] = 0
+        setup_test_environment()
+        try:
+            with override_settings(**overrides):
+                self.run(options)
+        finally:
+            teardown_test_environment()
+
+    def run(self, options):
+        client = Client()
+        for label, url in storefront_urls():
+            for _ in range(options['warmup']):
+                client.get(url)
+            with TemplateProfiler() as profiler:
+                for _ in range(options['requests']):
+                    response = client.get(url)
+                    if response.status_code != 200:
+                        raise CommandError(f'{url} returned {response.status_code}')
+            self.report(label, profiler.stats, options)
+
+    def report(self, label, stats, options):
+        count = options['requests']
+        self.stdout.write(f'\n{label}')
+        self.stdout.write(f"  {'template':<48} {'renders':>8} {'total ms':>9} {'self ms':>9}")
+        ranked = sorted(stats.items(), key=lambda item: item[1]['self'], reverse=True)
+        for name, entry in ranked[:options['top']]:
+            self.stdout.write(
+                f"  {name:<48} {entry['calls'] / count:>8.1f} "
+                f"{entry['total'] * 1000 / count:>9.2f} {entry['self'] * 1000 / count:>9.2f}"
+            )
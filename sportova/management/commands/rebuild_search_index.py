@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+from sportova.search import ensure_search_index, rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = 'Create the product full-text index if needed and rebuild it from the product table'
+
+    def handle(self, *args, **options):
+        ensure_search_index()
+        rebuild_search_index()
+        self.stdout.write(self.style.SUCCESS('Rebuilt product search index'))
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from sportova.cache import bump_catalog_version
+from sportova.models import Category
+
+
+class Command(BaseCommand):
+    help = 'Recompute the denormalized product count of every category'
+
+    def handle(self, *args, **options):
+        updated = Category.objects.all().refresh_product_counts()
+        bump_catalog_version()
+        self.stdout.write(self.style.SUCCESS(f'Refreshed product counts for {updated} categories'))
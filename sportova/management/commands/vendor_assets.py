@@ -0,0 +1,193 @@
+import json
+import re
+import urllib.request
+from io import BytesIO
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.text import slugify
+from sportova.assets import (
+    BOOTSTRAP_CSS_URL, BOOTSTRAP_JS_URL, FONT_AWESOME_URL, GOOGLE_FONT_FAMILIES, VENDOR_DIR, google_fonts_url,
+    vendor_manifest,
+)
+
+try:
+    from fontTools import subset as font_subset
+except ImportError:  # Font Awesome fonts are then kept whole; the CSS is still subsetted
+    font_subset = None
+
+# Google Fonts only serves woff2 to browsers it recognises
+USER_AGENT = 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36'
+FONT_SUBSETS = ('latin',)
+NAMED_WEIGHTS = {'normal': 400, 'bold': 700}
+# Bootstrap classes that set a font weight
+BOOTSTRAP_WEIGHT_CLASSES = {
+    'fw-light': 300, 'fw-normal': 400, 'fw-medium': 500, 'fw-semibold': 600, 'fw-bold': 700,
+    'lead': 300, 'display-1': 300, 'display-2': 300, 'display-3': 300,
+    'display-4': 300, 'display-5': 300, 'display-6': 300,
+}
+
+ICON_RULE = re.compile(r'((?:\.fa-[a-z0-9-]+:(?:before|after),?)+)\{content:"([^"]*)"\}')
+SOURCE_MAP = re.compile(r'/\*# sourceMappingURL=[^*]*\*/|//# sourceMappingURL=\S*')
+FONT_FACE = re.compile(r'/\* ([\w-]+) \*/\s*@font-face \{(.*?)\}', re.S)
+
+
+def fetch(url):
+    request = urllib.request.Request(url, headers={'User-Agent': USER_AGENT})
+    try:
+        with urllib.request.urlopen(request, timeout=30) as response:
+            return response.read()
+    except OSError as e:
+        raise CommandError(f'Could not download {url}: {e}')
+
+
+def _codepoint(content):
+    return int(content[1:], 16) if content.startswith('\\') else ord(content[0])
+
+
+def subset_font_awesome_css(css, icons):
+    """Keep only the icon rules for `icons` ('fa-whatsapp', ...); returns (css, codepoints)"""
+    codepoints = set()
+
+    def keep_used(match):
+        selectors = [
+            selector for selector in match.group(1).split(',')
+            if selector and selector[1:].split(':')[0] in icons
+        ]
+        if not selectors:
+            return ''
+        codepoints.add(_codepoint(match.group(2)))
+        return f'{",".join(selectors)}{{content:"{match.group(2)}"}}'
+
+    css = ICON_RULE.sub(keep_used, css)
+    # Only the woff2 files are vendored
+    css = re.sub(r',url\(\.\./webfonts/[^)]+\.ttf\) format\("truetype"\)', '', css)
+    return css, codepoints
+
+
+def subset_font(data, codepoints):
+    options = font_subset.Options()
+    options.flavor = 'woff2'
+    font = font_subset.load_font(BytesIO(data), options)
+    subsetter = font_subset.Subsetter(options)
+    subsetter.populate(unicodes=codepoints)
+    subsetter.subset(font)
+    output = BytesIO()
+    font_subset.save_font(font, output, options)
+    return output.getvalue()
+
+
+def used_font_weights(text):
+    """Every font weight the CSS and templates ask for, plus the regular weight"""
+    weights = {400}
+    for value in re.findall(r'font-weight:\s*(\w+)', text):
+        if value.isdigit():
+            weights.add(int(value))
+        elif value in NAMED_WEIGHTS:
+            weights.add(NAMED_WEIGHTS[value])
+    classes = set(re.findall(r'[\w-]+', ' '.join(re.findall(r'class="([^"]*)"', text))))
+    weights.update(weight for name, weight in BOOTSTRAP_WEIGHT_CLASSES.items() if name in classes)
+    return weights
+
+
+class Command(BaseCommand):
+    help = (
+        'Download Bootstrap, Font Awesome and the Google web fonts into static/vendor, '
+        'subsetted to the icons and weights the templates use'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output', default=Path(settings.STATICFILES_DIRS[0]) / VENDOR_DIR,
+            type=Path, help='Directory to write the vendored files to (default: static/vendor)'
+        )
+
+    def handle(self, *args, **options):
+        self.output = options['output'].resolve()
+        text = self.source_text()
+        stylesheets, preload = [], []
+
+        bootstrap_css = self.write('bootstrap/bootstrap.min.css', SOURCE_MAP.sub('', fetch(BOOTSTRAP_CSS_URL).decode()))
+        bootstrap_js = self.write('bootstrap/bootstrap.bundle.min.js', SOURCE_MAP.sub('', fetch(BOOTSTRAP_JS_URL).decode()))
+        stylesheets.append(bootstrap_css)
+
+        font_awesome_css, solid_font = self.vendor_font_awesome(text)
+        stylesheets.append(font_awesome_css)
+        preload.append(solid_font)
+
+        fonts_css, body_fonts = self.vendor_google_fonts(text)
+        stylesheets.append(fonts_css)
+        preload.extend(body_fonts)
+
+        self.write('manifest.json', json.dumps({
+            'stylesheets': stylesheets, 'scripts': [bootstrap_js], 'preload': preload,
+        }, indent=2))
+        vendor_manifest.cache_clear()
+        self.stdout.write(self.style.SUCCESS(f'Vendored {len(stylesheets)} stylesheets to {self.output}'))
+
+    def source_text(self):
+        """Templates and first-party static CSS/JS, scanned for icons and font weights"""
+        roots = [Path(directory) for config in settings.TEMPLATES for directory in config.get('DIRS', [])]
+        roots += [Path(directory) for directory in settings.STATICFILES_DIRS]
+        return '\n'.join(
+            path.read_text(errors='ignore')
+            for root in roots
+            for path in root.rglob('*')
+            if path.suffix in ('.html', '.css', '.js') and self.output not in path.parents
+        )
+
+    def write(self, name, content):
+        """Write a file under the output directory; returns its static path"""
+        path = self.output / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if isinstance(content, str):
+            path.write_text(content)
+        else:
+            path.write_bytes(content)
+        return f'{VENDOR_DIR}/{name}'
+
+    def vendor_font_awesome(self, text):
+        icons = set(re.findall(r'\bfa-[a-z0-9-]+', text))
+        css, codepoints = subset_font_awesome_css(fetch(FONT_AWESOME_URL).decode(), icons)
+        base_url = FONT_AWESOME_URL.rsplit('/css/', 1)[0]
+        for font in sorted(set(re.findall(r'url\(\.\./webfonts/([^)]+\.woff2)\)', css))):
+            data = fetch(f'{base_url}/webfonts/{font}')
+            if font_subset is not None:
+                data = subset_font(data, codepoints)
+            self.write(f'fontawesome/webfonts/{font}', data)
+        if font_subset is None:
+            self.stderr.write('fontTools is not installed; Font Awesome fonts were vendored without subsetting')
+        self.stdout.write(f'Font Awesome: {len(codepoints)} icons')
+        return self.write('fontawesome/css/all.subset.css', css), f'{VENDOR_DIR}/fontawesome/webfonts/fa-solid-900.woff2'
+
+    def vendor_google_fonts(self, text):
+        """Write the fonts and fonts.css; returns its path and the regular-weight files of the body font"""
+        weights = used_font_weights(text)
+        families = {
+            family: [weight for weight in available if weight in weights]
+            for family, available in GOOGLE_FONT_FAMILIES.items()
+            if f"'{family}'" in text or f'"{family}"' in text
+        }
+        body = re.search(r'\bbody\s*\{[^}]*font-family:\s*[\'"]([^\'"]+)', text)
+        body_family = body.group(1) if body else None
+
+        css = fetch(google_fonts_url(families)).decode()
+        faces, files, body_fonts = [], {}, []
+        for subset, face in FONT_FACE.findall(css):
+            if subset not in FONT_SUBSETS:
+                continue
+            family = re.search(r"font-family: '([^']+)'", face).group(1)
+            weight = int(re.search(r'font-weight: (\d+)', face).group(1))
+            url = re.search(r'url\((https://[^)]+)\)', face).group(1)
+            # Variable fonts serve every weight from one file
+            if url not in files:
+                files[url] = f'{slugify(family)}-{weight}-{subset}.woff2'
+                self.write(f'fonts/{files[url]}', fetch(url))
+            if family == body_family and weight == 400:
+                body_fonts.append(f'{VENDOR_DIR}/fonts/{files[url]}')
+            faces.append(f'/* {subset} */\n@font-face {{{face.replace(url, files[url])}}}')
+        self.stdout.write(
+            'Fonts: ' + ', '.join(f"{family} {'/'.join(map(str, weights))}" for family, weights in families.items())
+        )
+        return self.write('fonts/fonts.css', '\n'.join(faces) + '\n'), body_fonts
@@ -1,18 +1,39 @@
 from django.db import models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.conf import settings
+from django.utils import timezone
 from django.urls import reverse
-from django.utils.text import slugify
-import re
-from urllib.parse import quote
+from django.utils.functional import cached_property
+from .contacts import product_links
+from .images import variant_url
+from .slugs import UniqueSlugMixin
+
+
+class CategoryQuerySet(models.QuerySet):
+    def refresh_product_counts(self):
+        """Recompute the denormalized product_count of these categories in a single UPDATE"""
+        counts = (
+            Product.objects.filter(category=OuterRef('pk'))
+            .order_by()
+            .values('category')
+            .annotate(total=Count('pk'))
+            .values('total')
+        )
+        return self.update(product_count=Coalesce(Subquery(counts), 0))
 
 
-class Category(models.Model):
+class Category(UniqueSlugMixin, models.Model):
     name = models.CharField(max_length=100, unique=True)
     slug = models.SlugField(max_length=100, unique=True, blank=True)
     image = models.ImageField(upload_to='categories/', blank=True, null=True)
+    # Maintained by Product.save and deletes; call refresh_product_counts() after bulk operations
+    product_count = models.PositiveIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = CategoryQuerySet.as_manager()
+
     class Meta:
         verbose_name_plural = 'Categories'
         ordering = ['name']
@@ -21,59 +42,101 @@ class Category(models.Model):
         return self.name
 
     def save(self, *args, **kwargs):
-        if not self.slug:
-            base_slug = slugify(self.name)
-            slug = base_slug
-            counter = 1
-            while Category.objects.filter(slug=slug).exclude(pk=self.pk).exists():
-                slug = f"{base_slug}-{counter}"
-                counter += 1
-            self.slug = slug
+        if not self._state.adding and not args and kwargs.get('update_fields') is None:
+            # product_count only changes through refresh_product_counts(); a stale in-memory value must not win
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'product_count'
+            ]
         super().save(*args, **kwargs)
 
     def get_absolute_url(self):
         return reverse('sportova:category_detail', kwargs={'slug': self.slug})
 
 
-class Product(models.Model):
+class ProductQuerySet(models.QuerySet):
+    def with_card_data(self):
+        """Resolve category and images up front so product cards render without per-card queries"""
+        return self.select_related('category').prefetch_related('images')
+
+    def delete(self):
+        """Delete the products, then recount their categories in one UPDATE rather than one per row"""
+        category_ids = list(self.order_by().values_list('category_id', flat=True).distinct())
+        deleted = super().delete()
+        Category.objects.filter(pk__in=category_ids).refresh_product_counts()
+        return deleted
+
+
+class Product(UniqueSlugMixin, models.Model):
     category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='products')
     name = models.CharField(max_length=200)
     description = models.TextField()
     slug = models.SlugField(max_length=200, unique=True, blank=True)
+    # Supplier stock keeping unit; the upsert key for import_catalog
+    sku = models.CharField(max_length=64, unique=True, null=True, blank=True)
     price = models.DecimalField(max_digits=10, decimal_places=2)
     size = models.CharField(max_length=100, default='N/A')
     is_featured = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = ProductQuerySet.as_manager()
+
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Back keyset pagination (see sportova.pagination) overall and per category
+            models.Index(fields=['-created_at', '-id'], name='product_created_id_idx'),
+            models.Index(fields=['category', '-created_at', '-id'], name='product_cat_created_id_idx'),
+            # Featured products on the home page; only a small slice of the table
+            models.Index(
+                fields=['-created_at'], condition=models.Q(is_featured=True), name='product_featured_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.name
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored category so save() can recount it if the product moves
+        instance._loaded_category_id = instance.__dict__.get('category_id')
+        return instance
+
+    @cached_property
+    def primary_image(self):
+        """Primary image (or first image) of the product, using prefetched images when available"""
+        if 'images' in getattr(self, '_prefetched_objects_cache', {}):
+            images = self.images.all()
+            return images[0] if images else None
+        return self.images.first()
+
     def save(self, *args, **kwargs):
-        if not self.slug:
-            base_slug = slugify(self.name)
-            slug = base_slug
-            counter = 1
-            while Product.objects.filter(slug=slug).exclude(pk=self.pk).exists():
-                slug = f"{base_slug}-{counter}"
-                counter += 1
-            self.slug = slug
         super().save(*args, **kwargs)
+        self.__dict__.pop('contact_links', None)
+
+        previous_category_id = getattr(self, '_loaded_category_id', None)
+        if previous_category_id != self.category_id:
+            Category.objects.filter(
+                pk__in=[pk for pk in (previous_category_id, self.category_id) if pk is not None]
+            ).refresh_product_counts()
+            self._loaded_category_id = self.category_id
 
     def get_absolute_url(self):
         return reverse('sportova:product_detail', kwargs={'slug': self.slug})
 
+    @cached_property
+    def contact_links(self):
+        return product_links(self)
+
     # WhatsApp contact
-    def get_whatsapp_url(self):
+    def get_whatsapp_message(self):
         size_info = f" (Size: {self.size})" if self.size and self.size != 'N/A' else ""
-        message = f"Hi, I'm interested in {self.name}{size_info} - ${self.price}"
-        # Clean number to digits only for wa.me compatibility
-        raw = getattr(settings, 'WHATSAPP_NUMBER', '')
-        phone_number = re.sub(r"\D", "", raw)
-        return f"https://wa.me/{phone_number}?text={quote(message)}"
+        return f"Hi, I'm interested in {self.name}{size_info} - ${self.price}"
+
+    def get_whatsapp_url(self):
+        return self.contact_links['whatsapp']
 
     # Email contact
     def get_email_recipient(self):
@@ -91,6 +154,9 @@ class Product(models.Model):
             f"Please provide more details.\n\nThank you!"
         )
 
+    def get_mailto_url(self):
+        return self.contact_links['mailto']
+
 
 class ProductImage(models.Model):
     product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='images')
@@ -101,6 +167,10 @@ class ProductImage(models.Model):
 
     class Meta:
         ordering = ['-is_primary', 'created_at']
+        indexes = [
+            # Image prefetch: WHERE product_id IN (...) ORDER BY is_primary DESC, created_at
+            models.Index(fields=['product', '-is_primary', 'created_at'], name='productimage_primary_idx'),
+        ]
 
     def __str__(self):
         return f"{self.product.name} - Image {self.id}"
@@ -148,6 +218,9 @@ class BackgroundImage(models.Model):
 
     class Meta:
         ordering = ['section']
+        indexes = [
+            models.Index(fields=['section'], condition=models.Q(is_active=True), name='background_active_idx'),
+        ]
         verbose_name = 'Background Image'
         verbose_name_plural = 'Background Images'
 
@@ -155,16 +228,17 @@ class BackgroundImage(models.Model):
         return f"{self.get_section_display()} - {self.name}"
 
     def get_css_background(self):
-        """Generate CSS background property with overlay"""
-        return f"""
-            background: 
-                linear-gradient(135deg, rgba({self.hex_to_rgb(self.overlay_color)}, {self.overlay_opacity}) 0%, rgba({self.hex_to_rgb(self.overlay_color)}, {self.overlay_opacity - 0.05}) 100%),
-                url('{self.image.url}') center/cover !important;
-            background-attachment: fixed;
-            background-size: cover !important;
-            background-position: center !important;
-            background-repeat: no-repeat !important;
-        """
+        """Generate CSS background property with overlay; compiled once into the backgrounds stylesheet"""
+        rgb = self.hex_to_rgb(self.overlay_color)
+        return (
+            f"background: linear-gradient(135deg, rgba({rgb}, {self.overlay_opacity}) 0%, "
+            f"rgba({rgb}, {self.overlay_opacity - 0.05}) 100%), "
+            f"url('{variant_url(self.image)}') center/cover !important;\n"
+            "    background-attachment: fixed;\n"
+            "    background-size: cover !important;\n"
+            "    background-position: center !important;\n"
+            "    background-repeat: no-repeat !important;"
+        )
 
     def hex_to_rgb(self, hex_color):
         """Convert hex color to RGB values"""
@@ -192,6 +266,10 @@ class ContactMessage(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at'], name='contactmessage_created_idx'),
+            models.Index(fields=['status', '-created_at'], name='contactmessage_status_idx'),
+        ]
         verbose_name = 'Contact Message'
         verbose_name_plural = 'Contact Messages'
 
@@ -227,25 +305,10 @@ class ContactReply(models.Model):
         is_new = self.pk is None
         super().save(*args, **kwargs)
 
-        # Send email automatically when reply is created
+        # Queue the reply email; the email worker marks it sent on delivery
         if is_new and not self.email_sent:
-            from django.utils import timezone
-            from .tasks import send_reply_email
-            try:
-                print(f"Success: New reply created, sending email to {self.contact_message.email}")
-                success = send_reply_email(self)
-                if success:
-                    # Update fields without triggering save again
-                    ContactReply.objects.filter(pk=self.pk).update(email_sent=True)
-                    ContactMessage.objects.filter(pk=self.contact_message.pk).update(
-                        replied_at=timezone.now(),
-                        status='in_progress'
-                    )
-                    print(f"Success: Email sent successfully and status updated")
-                else:
-                    print(f"ERROR: Email sending failed")
-            except Exception as e:
-                print(f"ERROR: Error sending email: {str(e)}")
+            from .tasks import enqueue_reply_email
+            enqueue_reply_email(self)
 
 
 class BannerPicture(models.Model):
@@ -261,6 +324,76 @@ class BannerPicture(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at'], condition=models.Q(is_active=True), name='banner_active_idx'),
+        ]
 
     def __str__(self):
         return self.name
+
+
+class OutboundEmail(models.Model):
+    KIND_CHOICES = [
+        ('contact_notification', 'Contact Notification'),
+        ('contact_confirmation', 'Contact Confirmation'),
+        ('reply', 'Reply'),
+    ]
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('dead', 'Dead Letter'),
+    ]
+
+    kind = models.CharField(max_length=30, choices=KIND_CHOICES)
+    contact_message = models.ForeignKey(ContactMessage, on_delete=models.CASCADE, related_name='outbound_emails')
+    reply = models.ForeignKey(ContactReply, on_delete=models.CASCADE, null=True, blank=True, related_name='outbound_emails')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['next_attempt_at', 'id']
+        verbose_name = 'Outbound Email'
+        verbose_name_plural = 'Outbound Emails'
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outboundemail_queue_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} for {self.contact_message_id} ({self.get_status_display()})"
+
+
+class ImageVariantJob(models.Model):
+    """Responsive-variant state of one stored image, built by `manage.py generate_image_variants`"""
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    name = models.CharField(max_length=255, unique=True, help_text="Storage path of the original image")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    source_hash = models.CharField(max_length=64, blank=True)
+    source_mtime = models.FloatField(null=True, blank=True)
+    variant_count = models.PositiveIntegerField(default=0)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['created_at', 'id']
+        verbose_name = 'Image Variant Job'
+        verbose_name_plural = 'Image Variant Jobs'
+        indexes = [
+            models.Index(fields=['status'], name='imagevariantjob_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.get_status_display()})"
@@ -0,0 +1,128 @@
+import base64
+import binascii
+from datetime import datetime
+
+from asgiref.sync import sync_to_async
+from django.core.paginator import Paginator
+from django.db.models import Q
+
+
+class CursorPage:
+    """One page of a keyset-paginated queryset; quacks enough like a Page for templates"""
+
+    def __init__(self, object_list, has_next, has_previous, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.has_next_page = has_next
+        self.has_previous_page = has_previous
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __bool__(self):
+        return bool(self.object_list)
+
+    def has_next(self):
+        return self.has_next_page
+
+    def has_previous(self):
+        return self.has_previous_page
+
+    def has_other_pages(self):
+        return self.has_next_page or self.has_previous_page
+
+
+class CursorPaginator:
+    """Keyset pagination on (created_at, id), newest first
+
+    Pages are fetched with a WHERE on the last seen row instead of OFFSET and
+    without a COUNT(*), so every page costs the same regardless of depth.
+    """
+
+    def __init__(self, queryset, per_page):
+        self.queryset = queryset.order_by('-created_at', '-id')
+        self.per_page = per_page
+
+    @staticmethod
+    def encode_cursor(obj):
+        raw = f"{obj.created_at.isoformat()}|{obj.pk}"
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    @staticmethod
+    def decode_cursor(cursor):
+        """Return (created_at, pk) or None for a missing or malformed cursor"""
+        if not cursor:
+            return None
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+            created_at, pk = raw.split('|')
+            return datetime.fromisoformat(created_at), int(pk)
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            return None
+
+    def _page_query(self, after=None, before=None):
+        """(queryset, before_key, after_key) for a page; the queryset fetches one extra row to detect more"""
+        before_key = self.decode_cursor(before)
+        after_key = self.decode_cursor(after)
+        if before_key:
+            created_at, pk = before_key
+            queryset = (
+                self.queryset
+                .filter(Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=pk))
+                .order_by('created_at', 'id')
+            )
+        else:
+            queryset = self.queryset
+            if after_key:
+                created_at, pk = after_key
+                queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+        return queryset[:self.per_page + 1], before_key, after_key
+
+    def _build_page(self, rows, before_key, after_key):
+        if before_key:
+            has_previous = len(rows) > self.per_page
+            rows = rows[:self.per_page][::-1]
+            has_next = True
+        else:
+            has_next = len(rows) > self.per_page
+            rows = rows[:self.per_page]
+            has_previous = after_key is not None
+
+        return CursorPage(
+            rows,
+            has_next=has_next and bool(rows),
+            has_previous=has_previous and bool(rows),
+            next_cursor=self.encode_cursor(rows[-1]) if rows else None,
+            previous_cursor=self.encode_cursor(rows[0]) if rows else None,
+        )
+
+    def get_page(self, after=None, before=None):
+        queryset, before_key, after_key = self._page_query(after, before)
+        return self._build_page(list(queryset), before_key, after_key)
+
+    async def aget_page(self, after=None, before=None):
+        queryset, before_key, after_key = self._page_query(after, before)
+        return self._build_page([row async for row in queryset], before_key, after_key)
+
+
+def paginate_products(request, queryset, per_page):
+    """Cursor pagination by default; ?page=N keeps classic numbered pages working"""
+    if 'page' in request.GET:
+        return Paginator(queryset.order_by('-created_at', '-id'), per_page).get_page(request.GET.get('page'))
+    return CursorPaginator(queryset, per_page).get_page(
+        after=request.GET.get('after'), before=request.GET.get('before')
+    )
+
+
+async def apaginate_products(request, queryset, per_page):
+    """paginate_products for async views"""
+    if 'page' in request.GET:
+        # Numbered pages need COUNT and OFFSET through Paginator, which is sync only
+        return await sync_to_async(paginate_products)(request, queryset, per_page)
+    return await CursorPaginator(queryset, per_page).aget_page(
+        after=request.GET.get('after'), before=request.GET.get('before')
+    )
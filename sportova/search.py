@@ -0,0 +1,144 @@
+"""Product search backed by the database's own full-text index
+
+SQLite uses an FTS5 table kept in sync by signals (see sportova.signals);
+PostgreSQL uses a GIN index over a weighted tsvector expression, which the
+database maintains itself, and matches category names alongside it like the
+FTS5 table does. Other databases fall back to icontains.
+"""
+import re
+
+from django.db import connection
+from django.db.models import Q, RawSQL
+
+FTS_TABLE = 'sportova_product_fts'
+PG_INDEX = 'sportova_product_search_idx'
+PG_VECTOR = (
+    "(setweight(to_tsvector('simple', coalesce(sportova_product.name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(sportova_product.description, '')), 'B'))"
+)
+INDEX_CHUNK_SIZE = 500
+
+
+def search_terms(query):
+    """Lowercased word tokens; anything else is dropped so queries can't inject syntax"""
+    return re.findall(r'\w+', query.lower())[:16]
+
+
+def ensure_search_index():
+    """Create the full-text index if the database supports one; safe to call repeatedly"""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+                "name, description, category, tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+            )
+        elif connection.vendor == 'postgresql':
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS {PG_INDEX} ON sportova_product USING gin ({PG_VECTOR})")
+
+
+def index_products(product_ids):
+    """Refresh the index rows of these products (missing ids are removed)"""
+    if connection.vendor != 'sqlite':
+        return
+    product_ids = list(product_ids)
+    with connection.cursor() as cursor:
+        for start in range(0, len(product_ids), INDEX_CHUNK_SIZE):
+            chunk = product_ids[start:start + INDEX_CHUNK_SIZE]
+            placeholders = ', '.join(['%s'] * len(chunk))
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})", chunk)
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE} (rowid, name, description, category) "
+                "SELECT p.id, p.name, p.description, c.name FROM sportova_product p "
+                f"JOIN sportova_category c ON c.id = p.category_id WHERE p.id IN ({placeholders})",
+                chunk,
+            )
+
+
+def rebuild_search_index():
+    if connection.vendor != 'sqlite':
+        ensure_search_index()
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE}")
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE} (rowid, name, description, category) "
+            "SELECT p.id, p.name, p.description, c.name FROM sportova_product p "
+            "JOIN sportova_category c ON c.id = p.category_id"
+        )
+
+
+def _match_sql(terms, category_id=None):
+    """SELECT of the ids matching every term and an ORDER BY ranking them, each with its params"""
+    category_params = [category_id] if category_id else []
+
+    if connection.vendor == 'sqlite':
+        match = ' '.join(f'"{term}"*' for term in terms)
+        category_sql = ' AND p.category_id = %s' if category_id else ''
+        select = (
+            f"SELECT p.id FROM {FTS_TABLE} f JOIN sportova_product p ON p.id = f.rowid "
+            f"WHERE {FTS_TABLE} MATCH %s{category_sql}"
+        )
+        # Name hits outweigh category and description hits
+        order = f" ORDER BY bm25({FTS_TABLE}, 10.0, 1.0, 2.0), p.id DESC"
+        return select, [match, *category_params], order, []
+
+    # The category name can't be part of the index expression, so products are found through the index
+    # (or their category) matching any term, then checked against the full vector for all of them
+    tsquery = ' & '.join(f'{term}:*' for term in terms)
+    any_term = ' | '.join(f'{term}:*' for term in terms)
+    vector = f"({PG_VECTOR} || setweight(to_tsvector('simple', sportova_category.name), 'C'))"
+    category_sql = ' AND sportova_product.category_id = %s' if category_id else ''
+    select = (
+        "SELECT sportova_product.id FROM sportova_product "
+        "JOIN sportova_category ON sportova_category.id = sportova_product.category_id "
+        f"WHERE ({PG_VECTOR} @@ to_tsquery('simple', %s) OR sportova_product.category_id IN ("
+        "SELECT id FROM sportova_category WHERE to_tsvector('simple', name) @@ to_tsquery('simple', %s))) "
+        f"AND {vector} @@ to_tsquery('simple', %s){category_sql}"
+    )
+    order = f" ORDER BY ts_rank({vector}, to_tsquery('simple', %s)) DESC, sportova_product.id DESC"
+    return select, [any_term, any_term, tsquery, *category_params], order, [tsquery]
+
+
+def _icontains_filter(terms):
+    q = Q()
+    for term in terms:
+        q &= Q(name__icontains=term) | Q(description__icontains=term) | Q(category__name__icontains=term)
+    return q
+
+
+def search_product_ids(query, category_id=None, limit=50):
+    """Ids of products matching every term (as a prefix), best match first"""
+    terms = search_terms(query)
+    if not terms:
+        return []
+
+    if connection.vendor not in ('sqlite', 'postgresql'):
+        from .models import Product
+        products = Product.objects.filter(_icontains_filter(terms))
+        if category_id:
+            products = products.filter(category_id=category_id)
+        return list(products.values_list('pk', flat=True)[:limit])
+
+    select, params, order, order_params = _match_sql(terms, category_id)
+    with connection.cursor() as cursor:
+        cursor.execute(f'{select}{order} LIMIT %s', [*params, *order_params, limit])
+        return [row[0] for row in cursor.fetchall()]
+
+
+def search_filter(query):
+    """Q matching the products search_product_ids would find, as a subquery rather than a list of ids"""
+    terms = search_terms(query)
+    if not terms:
+        return Q(pk__in=[])
+    if connection.vendor not in ('sqlite', 'postgresql'):
+        return _icontains_filter(terms)
+    select, params, _, _ = _match_sql(terms)
+    return Q(pk__in=RawSQL(select, params))
+
+
+def search_products(query, category_id=None, limit=50):
+    """Products for a search, in rank order, with card data resolved"""
+    from .models import Product
+    ids = search_product_ids(query, category_id, limit)
+    products = Product.objects.with_card_data().in_bulk(ids)
+    return [products[pk] for pk in ids if pk in products]
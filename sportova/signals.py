@@ -0,0 +1,86 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_migrate, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .cache import bump_catalog_version
+from .context_processors import invalidate_backgrounds_cache
+from .models import BackgroundImage, BannerPicture, Category, Product, ProductImage, Shipment
+from .images import enqueue_variants
+from .search import ensure_search_index, index_products
+
+CATALOG_MODELS = (Category, Product, ProductImage, BannerPicture, Shipment, BackgroundImage)
+
+
+@receiver(post_delete, sender=Product)
+def update_category_product_count(sender, instance, origin=None, **kwargs):
+    """Keep Category.product_count in sync when a single product is deleted
+
+    Queryset deletes recount once in ProductQuerySet.delete, and a deleted
+    category takes its products (and its count) with it.
+    """
+    if isinstance(origin, Product):
+        Category.objects.filter(pk=instance.category_id).refresh_product_counts()
+
+
+@receiver(post_save, sender=BackgroundImage)
+@receiver(post_delete, sender=BackgroundImage)
+def clear_backgrounds_cache(sender, **kwargs):
+    invalidate_backgrounds_cache()
+    # Drop anything a concurrent request cached from pre-commit data
+    transaction.on_commit(invalidate_backgrounds_cache)
+
+
+def invalidate_catalog_cache(sender, **kwargs):
+    bump_catalog_version()
+    transaction.on_commit(bump_catalog_version)
+
+
+for model in CATALOG_MODELS:
+    post_save.connect(invalidate_catalog_cache, sender=model, dispatch_uid=f'catalog-cache-save-{model.__name__}')
+    post_delete.connect(invalidate_catalog_cache, sender=model, dispatch_uid=f'catalog-cache-delete-{model.__name__}')
+
+
+@receiver(post_migrate)
+def create_search_index(sender, **kwargs):
+    if sender.name == 'sportova':
+        ensure_search_index()
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def update_product_search_index(sender, instance, **kwargs):
+    index_products([instance.pk])
+
+
+@receiver(post_save, sender=Category)
+def update_category_search_index(sender, instance, created, **kwargs):
+    # The category name is indexed with each product
+    if not created:
+        index_products(instance.products.values_list('pk', flat=True))
+
+
+@receiver(post_save, sender=ProductImage)
+@receiver(post_delete, sender=ProductImage)
+def touch_image_product(sender, instance, origin=None, **kwargs):
+    """Product cards are cached per (pk, updated_at), so an image change moves its product's updated_at"""
+    # Images deleted along with their product (or category) have nothing left to touch
+    if origin is not None and getattr(origin, 'model', type(origin)) is not ProductImage:
+        return
+    Product.objects.filter(pk=instance.product_id).update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Category)
+def touch_category_products(sender, instance, created, **kwargs):
+    # The cards show the category name
+    if not created:
+        instance.products.update(updated_at=timezone.now())
+
+
+def queue_image_variants(sender, instance, **kwargs):
+    """Queue responsive variants of an upload for the generate_image_variants worker"""
+    transaction.on_commit(lambda: enqueue_variants(instance.image))
+
+
+for model in (Category, ProductImage, BannerPicture, BackgroundImage):
+    post_save.connect(queue_image_variants, sender=model, dispatch_uid=f'image-variants-{model.__name__}')
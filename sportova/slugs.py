@@ -0,0 +1,109 @@
+import re
+
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Q
+from django.utils.text import slugify
+
+SUFFIX_RE = re.compile(r'^(.*)-(\d+)$')
+
+
+def taken_slugs_filter(base_slug):
+    """Q for base_slug itself and every base_slug-<suffix>, in a form the slug index can serve"""
+    if connection.vendor == 'sqlite':
+        # SQLite's LIKE is case-insensitive and can't use the index; '-' sorts right before '.'
+        return Q(slug=base_slug) | Q(slug__gte=f'{base_slug}-', slug__lt=f'{base_slug}.')
+    return Q(slug__startswith=base_slug)
+
+
+def next_free_slug(model, base_slug, exclude_pk=None, max_length=None):
+    """Return base_slug or base_slug-<n> with the next free suffix, using a single indexed query"""
+    max_length = max_length or model._meta.get_field('slug').max_length
+    base_slug = base_slug[:max_length]
+    taken = model._default_manager.filter(taken_slugs_filter(base_slug))
+    if exclude_pk is not None:
+        taken = taken.exclude(pk=exclude_pk)
+    taken = set(taken.values_list('slug', flat=True))
+    if base_slug not in taken:
+        return base_slug
+
+    suffix_re = re.compile(rf'^{re.escape(base_slug)}-(\d+)$')
+    suffixes = [int(match.group(1)) for match in map(suffix_re.match, taken) if match]
+    suffix = f"-{max(suffixes, default=0) + 1}"
+    if len(base_slug) + len(suffix) > max_length:
+        # Trim the base so the suffix fits, then allocate against the shorter prefix
+        return next_free_slug(model, base_slug[:max_length - len(suffix)].rstrip('-'), exclude_pk, max_length)
+    return f"{base_slug}{suffix}"
+
+
+def allocate_slugs(model, values, chunk_size=200):
+    """Allocate one free slug per value in bulk, for rows created with bulk_create
+
+    Existing slugs are fetched with one indexed query per chunk of distinct
+    bases; duplicates within `values` get increasing suffixes.
+    """
+    max_length = model._meta.get_field('slug').max_length
+    bases = [(slugify(value) or model._meta.model_name)[:max_length] for value in values]
+    distinct = sorted(set(bases))
+    base_free = {}
+    next_suffix = {}
+    for start in range(0, len(distinct), chunk_size):
+        chunk = distinct[start:start + chunk_size]
+        taken = Q()
+        for base in chunk:
+            taken |= taken_slugs_filter(base)
+        for base in chunk:
+            base_free[base] = True
+            next_suffix[base] = 1
+        # One pass over the taken slugs: each is either a bare base or base-<n>
+        for slug in model._default_manager.filter(taken).values_list('slug', flat=True).iterator():
+            if slug in base_free:
+                base_free[slug] = False
+            match = SUFFIX_RE.match(slug)
+            if match and match.group(1) in next_suffix:
+                next_suffix[match.group(1)] = max(next_suffix[match.group(1)], int(match.group(2)) + 1)
+
+    slugs = []
+    allocated = set()
+    for base in bases:
+        slug = base if base_free[base] and base not in allocated else None
+        base_free[base] = False
+        # Skip suffixes another base in this batch already produced (e.g. "a-1" vs "a" + 1)
+        while slug is None or slug in allocated:
+            suffix = f"-{next_suffix[base]}"
+            next_suffix[base] += 1
+            if len(base) + len(suffix) > max_length:
+                # Rare: fall back to a per-row lookup against a trimmed base
+                slug = next_free_slug(model, base[:max_length - len(suffix)].rstrip('-'), max_length=max_length)
+                break
+            slug = f"{base}{suffix}"
+        allocated.add(slug)
+        slugs.append(slug)
+    return slugs
+
+
+class UniqueSlugMixin:
+    """Fill an empty `slug` from `slug_source_field` on save
+
+    The free suffix is found with one query; if a concurrent insert takes the
+    same slug first, the save is retried with a freshly allocated one.
+    """
+
+    slug_source_field = 'name'
+    slug_save_attempts = 5
+
+    def save(self, *args, **kwargs):
+        if self.slug:
+            return super().save(*args, **kwargs)
+
+        model = type(self)
+        base_slug = slugify(getattr(self, self.slug_source_field)) or model._meta.model_name
+        for attempt in range(1, self.slug_save_attempts + 1):
+            self.slug = next_free_slug(model, base_slug, exclude_pk=self.pk)
+            try:
+                with transaction.atomic():
+                    return super().save(*args, **kwargs)
+            except IntegrityError:
+                slug_clash = model._default_manager.filter(slug=self.slug).exclude(pk=self.pk).exists()
+                if not slug_clash or attempt == self.slug_save_attempts:
+                    self.slug = ''
+                    raise
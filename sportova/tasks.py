@@ -1,117 +1,177 @@
-from django.core.mail import send_mail, EmailMultiAlternatives
+from django.core.mail import EmailMultiAlternatives
 from django.conf import settings
-from django.template.loader import render_to_string
+from django.db.models import Q
 from django.utils import timezone
+from datetime import timedelta
 import logging
+from .mail import email_pool, email_renderer
 
 logger = logging.getLogger(__name__)
 
 
-def send_contact_notification_email(contact_message):
-    try:
-        subject = f"New Contact Message: {contact_message.subject}"
+def build_contact_notification_email(contact_message):
+    subject = f"New Contact Message: {contact_message.subject}"
+    html_content, text_content = email_renderer.render('contact_notification', contact_message=contact_message)
 
-        # Context for the HTML template
-        context = {
-            'contact_message': contact_message,
-            'current_year': timezone.now().year,
-        }
+    # Create email with both HTML and text versions
+    email = EmailMultiAlternatives(
+        subject=subject,
+        body=text_content,
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[settings.SPORTOVA_OWNER_EMAIL],
+    )
+    email.attach_alternative(html_content, "text/html")
+    return email
 
-        # Render HTML and text templates
-        html_content = render_to_string('emails/contact_notification.html', context)
-        text_content = render_to_string('emails/contact_notification.txt', context)
 
-        # Create email with both HTML and text versions
-        email = EmailMultiAlternatives(
-            subject=subject,
-            body=text_content,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            to=[settings.SPORTOVA_OWNER_EMAIL],
-        )
-        email.attach_alternative(html_content, "text/html")
-        email.send()
-
-        logger.info(f"Contact notification email sent successfully for message ID: {contact_message.id}")
-        return True
-
-    except Exception as e:
-        logger.error(f"Failed to send contact notification email for message ID: {contact_message.id}. Error: {str(e)}")
-        return False
-
-
-def send_contact_confirmation_email(contact_message):
-    try:
-        subject = "Thank you for contacting Sportova!"
-
-        # Context for the HTML template
-        context = {
-            'contact_message': contact_message,
-            'current_year': timezone.now().year,
-            'whatsapp_number': settings.WHATSAPP_NUMBER,
-            'contact_email': settings.CONTACT_EMAIL,
-        }
-
-        # Render HTML and text templates
-        html_content = render_to_string('emails/contact_confirmation.html', context)
-        text_content = render_to_string('emails/contact_confirmation.txt', context)
-
-        # Create email with both HTML and text versions
-        email = EmailMultiAlternatives(
-            subject=subject,
-            body=text_content,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            to=[contact_message.email],
-        )
-        email.attach_alternative(html_content, "text/html")
-        email.send()
+def build_contact_confirmation_email(contact_message):
+    subject = "Thank you for contacting Sportova!"
+    html_content, text_content = email_renderer.render('contact_confirmation', contact_message=contact_message)
 
-        logger.info(f"Contact confirmation email sent successfully to: {contact_message.email}")
-        return True
+    # Create email with both HTML and text versions
+    email = EmailMultiAlternatives(
+        subject=subject,
+        body=text_content,
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[contact_message.email],
+    )
+    email.attach_alternative(html_content, "text/html")
+    return email
 
-    except Exception as e:
-        logger.error(f"Failed to send contact confirmation email to: {contact_message.email}. Error: {str(e)}")
-        return False
 
+def build_reply_email(reply):
+    subject = f"Re: {reply.contact_message.subject}"
+    html_content, text_content = email_renderer.render('reply', reply=reply)
 
-def send_reply_email(reply):
-    try:
-        subject = f"Re: {reply.contact_message.subject}"
+    # Create email with both HTML and text versions
+    email = EmailMultiAlternatives(
+        subject=subject,
+        body=text_content,
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[reply.contact_message.email],
+    )
+    email.attach_alternative(html_content, "text/html")
+    return email
 
-        # Debug logging
-        print(f"DEBUG: Attempting to send reply email to {reply.contact_message.email}")
-        print(f"DEBUG: Subject: {subject}")
 
-        # Context for the HTML template
-        context = {
-            'reply': reply,
-            'current_year': timezone.now().year,
-            'whatsapp_number': settings.WHATSAPP_NUMBER,
-            'contact_email': settings.CONTACT_EMAIL,
-        }
+# Outbound email queue
 
-        # Render HTML and text templates
-        html_content = render_to_string('emails/reply_email.html', context)
-        text_content = render_to_string('emails/reply_email.txt', context)
+EMAIL_QUEUE_MAX_ATTEMPTS = getattr(settings, 'SPORTOVA_EMAIL_QUEUE_MAX_ATTEMPTS', 6)
+EMAIL_QUEUE_RETRY_DELAY = getattr(settings, 'SPORTOVA_EMAIL_QUEUE_RETRY_DELAY', 30)
+EMAIL_QUEUE_MAX_RETRY_DELAY = getattr(settings, 'SPORTOVA_EMAIL_QUEUE_MAX_RETRY_DELAY', 60 * 60)
+# Rows left in 'sending' longer than this belong to a crashed worker and are reclaimed
+EMAIL_QUEUE_LOCK_TIMEOUT = getattr(settings, 'SPORTOVA_EMAIL_QUEUE_LOCK_TIMEOUT', 10 * 60)
 
-        print(f"DEBUG: Templates rendered successfully")
 
-        # Create email with both HTML and text versions
-        email = EmailMultiAlternatives(
-            subject=subject,
-            body=text_content,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            to=[reply.contact_message.email],
-        )
-        email.attach_alternative(html_content, "text/html")
+def _contact_emails(contact_message):
+    from .models import OutboundEmail
+    return [
+        OutboundEmail(kind='contact_notification', contact_message=contact_message),
+        OutboundEmail(kind='contact_confirmation', contact_message=contact_message),
+    ]
+
+
+def enqueue_contact_emails(contact_message):
+    """Queue the owner notification and the customer confirmation for a new contact message"""
+    from .models import OutboundEmail
+    return OutboundEmail.objects.bulk_create(_contact_emails(contact_message))
+
+
+async def aenqueue_contact_emails(contact_message):
+    """enqueue_contact_emails for async views"""
+    from .models import OutboundEmail
+    return await OutboundEmail.objects.abulk_create(_contact_emails(contact_message))
+
 
-        print(f"DEBUG: Email object created, attempting to send...")
-        email.send()
-        print(f"DEBUG: Email sent successfully!")
+def enqueue_reply_email(reply):
+    from .models import OutboundEmail
+    return OutboundEmail.objects.create(kind='reply', contact_message=reply.contact_message, reply=reply)
+
+
+def build_outbound_email(outbound):
+    if outbound.kind == 'contact_notification':
+        return build_contact_notification_email(outbound.contact_message)
+    if outbound.kind == 'contact_confirmation':
+        return build_contact_confirmation_email(outbound.contact_message)
+    if outbound.kind == 'reply':
+        return build_reply_email(outbound.reply)
+    raise ValueError(f"Unknown outbound email kind: {outbound.kind}")
+
+
+def retry_delay(attempts):
+    """Exponential backoff: base delay doubled per failed attempt, capped"""
+    return min(EMAIL_QUEUE_RETRY_DELAY * 2 ** (attempts - 1), EMAIL_QUEUE_MAX_RETRY_DELAY)
+
+
+def _mark_delivered(outbound, now):
+    from .models import ContactMessage, ContactReply, OutboundEmail
+    OutboundEmail.objects.filter(pk=outbound.pk).update(
+        status='sent', attempts=outbound.attempts + 1, sent_at=now, locked_at=None, last_error=''
+    )
+    if outbound.kind == 'reply':
+        ContactReply.objects.filter(pk=outbound.reply_id).update(email_sent=True)
+        ContactMessage.objects.filter(pk=outbound.contact_message_id).update(
+            replied_at=now,
+            status='in_progress'
+        )
 
-        logger.info(f"Reply email sent successfully to: {reply.contact_message.email}")
-        return True
 
-    except Exception as e:
-        print(f"DEBUG: Email sending failed: {str(e)}")
-        logger.error(f"Failed to send reply email to: {reply.contact_message.email}. Error: {str(e)}")
-        return False
+def _mark_failed(outbound, now, error):
+    from .models import OutboundEmail
+    attempts = outbound.attempts + 1
+    if attempts >= EMAIL_QUEUE_MAX_ATTEMPTS:
+        logger.error(f"Outbound email {outbound.pk} ({outbound.kind}) moved to dead letter after {attempts} attempts. Error: {error}")
+        status, next_attempt_at = 'dead', outbound.next_attempt_at
+    else:
+        delay = retry_delay(attempts)
+        logger.warning(f"Outbound email {outbound.pk} ({outbound.kind}) failed, retrying in {delay}s. Error: {error}")
+        status, next_attempt_at = 'pending', now + timedelta(seconds=delay)
+    OutboundEmail.objects.filter(pk=outbound.pk).update(
+        status=status, attempts=attempts, next_attempt_at=next_attempt_at, locked_at=None, last_error=str(error)
+    )
+    return status
+
+
+def claim_outbound_emails(batch_size=50):
+    """Atomically move due emails to 'sending' and return the ones this worker won"""
+    from .models import OutboundEmail
+    now = timezone.now()
+    due = (
+        Q(status='pending', next_attempt_at__lte=now)
+        | Q(status='sending', locked_at__lt=now - timedelta(seconds=EMAIL_QUEUE_LOCK_TIMEOUT))
+    )
+    candidates = list(OutboundEmail.objects.filter(due).values_list('pk', flat=True)[:batch_size])
+    claimed = [
+        pk for pk in candidates
+        # Conditional update so two workers never claim the same row
+        if OutboundEmail.objects.filter(due, pk=pk).update(status='sending', locked_at=now)
+    ]
+    return list(
+        OutboundEmail.objects.filter(pk__in=claimed)
+        .select_related('contact_message', 'reply__contact_message')
+    )
+
+
+def process_email_queue(batch_size=50, pool=None):
+    """Send one batch of due queued emails over a shared connection; returns counts of sent, retried and dead emails"""
+    pool = pool or email_pool
+    results = {'sent': 0, 'retry': 0, 'dead': 0}
+
+    batch = []
+    for outbound in claim_outbound_emails(batch_size):
+        try:
+            batch.append((outbound, build_outbound_email(outbound)))
+        except Exception as e:
+            status = _mark_failed(outbound, timezone.now(), e)
+            results['retry' if status == 'pending' else 'dead'] += 1
+
+    outcomes = pool.send_messages([message for _, message in batch])
+    for (outbound, _), (_, error) in zip(batch, outcomes):
+        if error is not None:
+            status = _mark_failed(outbound, timezone.now(), error)
+            results['retry' if status == 'pending' else 'dead'] += 1
+        else:
+            _mark_delivered(outbound, timezone.now())
+            logger.info(f"Outbound email {outbound.pk} ({outbound.kind}) sent")
+            results['sent'] += 1
+    return results
@@ -0,0 +1,42 @@
+from django import template
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
+
+from sportova.assets import CDN_SCRIPTS, CDN_STYLESHEETS, CSS_BUNDLES, bundle_is_collected, vendor_manifest
+
+register = template.Library()
+
+
+def _stylesheet_links(urls):
+    return format_html_join('\n    ', '<link rel="stylesheet" href="{}">', ((url,) for url in urls))
+
+
+@register.simple_tag
+def stylesheet_bundle(name):
+    """<link> to a collected CSS bundle, or to each of its source files until collectstatic has built it"""
+    output, sources = CSS_BUNDLES[name]
+    paths = [output] if bundle_is_collected(output) else sources
+    return _stylesheet_links(static(path) for path in paths)
+
+
+@register.simple_tag
+def vendor_stylesheets():
+    """Font preload hints and the self-hosted Bootstrap, Font Awesome and font CSS
+
+    Falls back to the CDN stylesheets until `manage.py vendor_assets` has run.
+    """
+    manifest = vendor_manifest()
+    if manifest is None:
+        return _stylesheet_links(CDN_STYLESHEETS)
+    preloads = format_html_join(
+        '\n    ', '<link rel="preload" href="{}" as="font" type="font/woff2" crossorigin>',
+        ((static(path),) for path in manifest['preload']),
+    )
+    return format_html('{}\n    {}', preloads, _stylesheet_links(static(path) for path in manifest['stylesheets']))
+
+
+@register.simple_tag
+def vendor_scripts():
+    manifest = vendor_manifest()
+    urls = CDN_SCRIPTS if manifest is None else [static(path) for path in manifest['scripts']]
+    return format_html_join('\n    ', '<script src="{}"></script>', ((url,) for url in urls))
@@ -0,0 +1,55 @@
+from django import template
+from django.forms.utils import flatatt
+from django.utils.html import format_html, format_html_join
+
+from sportova.images import (
+    FORMAT_MIME_TYPES, MODERN_FORMATS, VARIANT_WIDTHS, available_formats, srcset, variant_name, variant_url,
+)
+
+register = template.Library()
+
+# Product/category card in a col-lg-4 col-md-6 grid
+CARD_SIZES = '(min-width: 1400px) 416px, (min-width: 992px) 33vw, (min-width: 768px) 50vw, 100vw'
+FALLBACK_WIDTH = 960
+# Swap in data-placeholder on a load error; <source> and srcset would otherwise win over src
+PLACEHOLDER_ONERROR = (
+    "this.onerror=null; this.removeAttribute('srcset'); "
+    "if (this.parentNode.tagName === 'PICTURE') this.parentNode.replaceWith(this); "
+    "this.src=this.getAttribute('data-placeholder');"
+)
+
+
+@register.simple_tag
+def responsive_image(field_file, sizes=CARD_SIZES, **attrs):
+    """<picture> with WebP/AVIF sources and a srcset fallback; plain <img> until variants exist
+
+    Extra keyword arguments become <img> attributes, with underscores turned
+    into hyphens (data_placeholder="..." -> data-placeholder="..."). A
+    data_placeholder is shown if the image fails to load.
+    """
+    attrs = {name.replace('_', '-'): value for name, value in attrs.items() if value is not None}
+    if 'data-placeholder' in attrs:
+        attrs.setdefault('onerror', PLACEHOLDER_ONERROR)
+    formats = available_formats(field_file)
+    if not formats:
+        return format_html('<img src="{}"{}>', field_file.url, flatatt(attrs))
+
+    fallback = formats[-1]
+    sources = format_html_join(
+        '', '<source type="{}" srcset="{}" sizes="{}">',
+        ((FORMAT_MIME_TYPES[fmt], srcset(field_file, fmt), sizes) for fmt in formats if fmt in MODERN_FORMATS),
+    )
+    return format_html(
+        '<picture style="display: contents">{}<img src="{}" srcset="{}" sizes="{}"{}></picture>',
+        sources,
+        field_file.storage.url(variant_name(field_file.name, FALLBACK_WIDTH, fallback)),
+        srcset(field_file, fallback),
+        sizes,
+        flatatt(attrs),
+    )
+
+
+@register.simple_tag
+def image_variant_url(field_file, width=VARIANT_WIDTHS[-1]):
+    """URL of one variant for CSS backgrounds; the original until variants exist"""
+    return variant_url(field_file, width)
@@ -1,3 +1,1079 @@
-from django.test import TestCase
+import os
+import smtplib
+import tempfile
+from datetime import timedelta
+from io import BytesIO, StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.core import mail
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.template import Context, Template
+from django.template.loader import get_template
+from django.db import connection
+from django.test import RequestFactory, TestCase as DjangoTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .cache import CATALOG_CHANGED_KEY, bump_catalog_version, get_catalog_cache_stats, get_catalog_version
+from .checks import check_catalog_cache_backend
+from .facets import FacetFilters, facet_counts, get_facet_summary
+from .contacts import clear_contact_caches, whatsapp_number
+from .context_processors import (
+    _local_backgrounds, background_images, get_active_backgrounds, get_background_stylesheet,
+    invalidate_backgrounds_cache, site_contacts,
+)
+from .models import (
+    BackgroundImage, Category, ContactMessage, ContactReply, ImageVariantJob, OutboundEmail, Product, ProductImage,
+)
+from .assets import minify_css
+from .images import VARIANT_WIDTHS, variant_name
+from .management.commands.benchmark_asgi import storefront_urlconf
+from .instrumentation import QueryBudgetExceeded, TemplateProfiler, get_request_stats, reset_request_stats
+from .mail import EmailConnectionPool, EmailRenderer
+from .pagination import CursorPaginator
+from .search import search_product_ids
+from .slugs import allocate_slugs, next_free_slug
+from .tasks import process_email_queue
+
+
+# Local memory is private to each test process, so parallel runs and dev servers don't share entries
+TEST_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'sportova-tests'}}
+
+
+@override_settings(CACHES=TEST_CACHES)
+class TestCase(DjangoTestCase):
+    """TestCase on a cache of its own, emptied before every test"""
+
+    def _pre_setup(self):
+        super()._pre_setup()
+        cache.clear()
+
+
+class ProductGridQueryTests(TestCase):
+    """Product grids must render in a constant number of queries"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(name='Football')
+
+    def setUp(self):
+        invalidate_backgrounds_cache()
+        get_active_backgrounds()
+
+    def create_products(self, count):
+        for i in range(count):
+            product = Product.objects.create(
+                category=self.category,
+                name=f'Ball {i}',
+                description='Match ball',
+                price=10,
+                is_featured=True,
+            )
+            ProductImage.objects.create(product=product, image=f'products/gallery/ball-{i}-a.jpg')
+            ProductImage.objects.create(product=product, image=f'products/gallery/ball-{i}-b.jpg', is_primary=True)
+
+    def test_primary_image_prefers_primary_flag(self):
+        self.create_products(1)
+        product = Product.objects.with_card_data().get()
+        with self.assertNumQueries(0):
+            self.assertTrue(product.primary_image.is_primary)
+            self.assertEqual(product.category.name, 'Football')
+
+    def test_product_list_query_count_is_constant(self):
+        self.create_products(9)
+        # categories, products, images, facet summary (cached until the catalog changes)
+        with self.assertNumQueries(4):
+            response = self.client.get(reverse('sportova:product_list'))
+        self.assertContains(response, 'ball-8-b.jpg')
+
+    def test_category_detail_query_count_is_constant(self):
+        self.create_products(9)
+        # category, products, images
+        with self.assertNumQueries(3):
+            self.client.get(self.category.get_absolute_url())
+
+    def test_home_query_count_is_constant(self):
+        self.create_products(6)
+        # categories, banners, featured products, images
+        with self.assertNumQueries(4):
+            self.client.get(reverse('sportova:home'))
+
+
+class CategoryProductCountTests(TestCase):
+    def setUp(self):
+        self.football = Category.objects.create(name='Football')
+        self.gloves = Category.objects.create(name='Gloves')
+
+    def make_product(self, category, name='Ball'):
+        return Product.objects.create(category=category, name=name, description='-', price=10)
+
+    def assertCounts(self, football, gloves):
+        self.football.refresh_from_db()
+        self.gloves.refresh_from_db()
+        self.assertEqual((self.football.product_count, self.gloves.product_count), (football, gloves))
+
+    def test_count_follows_create_move_and_delete(self):
+        product = self.make_product(self.football)
+        self.make_product(self.football, 'Ball 2')
+        self.assertCounts(2, 0)
+
+        product = Product.objects.get(pk=product.pk)
+        product.category = self.gloves
+        product.save()
+        self.assertCounts(1, 1)
+
+        Product.objects.filter(category=self.football).delete()
+        self.assertCounts(0, 1)
+
+    def test_saving_a_category_keeps_its_count(self):
+        category = Category.objects.get(pk=self.football.pk)
+        self.make_product(self.football)
+        self.make_product(self.football, 'Ball 2')
+        category.name = 'Soccer'
+        category.save()
+        self.assertCounts(2, 0)
+        self.assertEqual(self.football.name, 'Soccer')
+
+    def test_bulk_delete_recounts_once(self):
+        for i in range(5):
+            self.make_product(self.football, f'Ball {i}')
+        self.make_product(self.gloves, 'Glove')
+        glove = self.make_product(self.gloves, 'Glove 2')
+        with CaptureQueriesContext(connection) as queries:
+            Product.objects.filter(name__startswith='Ball').delete()
+        recounts = [query for query in queries if query['sql'].startswith('UPDATE "sportova_category"')]
+        self.assertEqual(len(recounts), 1)
+        self.assertCounts(0, 2)
+        glove.delete()
+        self.assertCounts(0, 1)
+
+    def test_refresh_after_bulk_create(self):
+        Product.objects.bulk_create([
+            Product(category=self.gloves, name=f'Glove {i}', slug=f'glove-{i}', description='-', price=5)
+            for i in range(3)
+        ])
+        self.assertCounts(0, 0)
+        call_command('refresh_product_counts', stdout=StringIO())
+        self.assertCounts(0, 3)
+
+    def test_category_list_does_not_count_per_card(self):
+        for i in range(6):
+            self.make_product(Category.objects.create(name=f'Category {i}'))
+        invalidate_backgrounds_cache()
+        get_active_backgrounds()
+        # count, categories
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('sportova:category_list'))
+        self.assertContains(response, '1 Product<')
+
+
+class BackgroundImagesCacheTests(TestCase):
+    def setUp(self):
+        invalidate_backgrounds_cache()
+        self.background = BackgroundImage.objects.create(
+            name='Stadium', section='hero', image='backgrounds/stadium.jpg'
+        )
+
+    def test_backgrounds_are_cached_until_changed(self):
+        with self.assertNumQueries(1):
+            backgrounds = get_active_backgrounds()
+        self.assertIn("url('/media/backgrounds/stadium.jpg')", backgrounds['bg_hero']['css'])
+        with self.assertNumQueries(0):
+            get_active_backgrounds()
+
+        self.background.is_active = False
+        self.background.save()
+        self.assertEqual(get_active_backgrounds(), {})
+
+    def test_backgrounds_are_evaluated_lazily(self):
+        with self.assertNumQueries(0):
+            context = background_images(RequestFactory().get('/'))
+        with self.assertNumQueries(1):
+            self.assertIn('bg_hero', context['backgrounds'])
+
+    def test_stylesheet_is_hashed_and_follows_changes(self):
+        _, version = get_background_stylesheet()
+        url = reverse('sportova:background_stylesheet', args=[version])
+        page = self.client.get(reverse('sportova:contact'))
+        self.assertContains(page, f'<link rel="stylesheet" href="{url}">')
+        self.assertNotContains(page, 'stadium.jpg')
+
+        response = self.client.get(url)
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertIn(".hero-section {\n    background: linear-gradient", response.content.decode())
+
+        self.background.overlay_color = '#000000'
+        self.background.save()
+        _, new_version = get_background_stylesheet()
+        self.assertNotEqual(new_version, version)
+        self.assertRedirects(
+            self.client.get(url), reverse('sportova:background_stylesheet', args=[new_version]),
+            fetch_redirect_response=False,
+        )
+
+    def test_stale_process_copy_serves_the_current_stylesheet(self):
+        get_background_stylesheet()
+        stale = _local_backgrounds['value']
+        self.background.overlay_color = '#000000'
+        self.background.save()
+        _, version = get_background_stylesheet()
+        # This process still holds the copy from before the change, as another worker would
+        _local_backgrounds.update(value=stale, expires=float('inf'))
+        response = self.client.get(reverse('sportova:background_stylesheet', args=[version]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(get_background_stylesheet()[1], version)
+
+
+class CatalogPageCacheTests(TestCase):
+    def setUp(self):
+        bump_catalog_version()
+        self.category = Category.objects.create(name='Football')
+        self.product = Product.objects.create(category=self.category, name='Ball', description='-', price=10)
+
+    def test_page_served_from_cache_until_catalog_changes(self):
+        url = reverse('sportova:product_list')
+        self.assertEqual(self.client.get(url)['X-Catalog-Cache'], 'miss')
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(response['X-Catalog-Cache'], 'hit')
+        self.assertContains(response, 'Ball')
+
+        self.product.name = 'Match Ball'
+        self.product.save()
+        response = self.client.get(url)
+        self.assertEqual(response['X-Catalog-Cache'], 'miss')
+        self.assertContains(response, 'Match Ball')
+        self.assertGreaterEqual(get_catalog_cache_stats()['product_list']['hits'], 1)
+
+    @override_settings(SPORTOVA_CATALOG_CACHE_DISABLED_VIEWS=['product_detail'])
+    def test_view_opt_out(self):
+        url = self.product.get_absolute_url()
+        self.client.get(url)
+        self.assertNotIn('X-Catalog-Cache', self.client.get(url))
+
+
+class CatalogCacheBackendCheckTests(TestCase):
+    def test_local_memory_cache_is_refused(self):
+        locmem = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+        with override_settings(CACHES=locmem):
+            self.assertEqual([error.id for error in check_catalog_cache_backend(None)], ['sportova.E001'])
+            with override_settings(SPORTOVA_CATALOG_CACHE_ENABLED=False):
+                self.assertEqual(check_catalog_cache_backend(None), [])
+        filebased = {'default': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': '-'}}
+        with override_settings(CACHES=filebased):
+            self.assertEqual(check_catalog_cache_backend(None), [])
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        self.category = Category.objects.create(name='Football')
+        self.product = Product.objects.create(category=self.category, name='Ball', description='-', price=10)
+        self.age_catalog()
+
+    def age_catalog(self):
+        # Last-Modified is only sent once the second of the last change is over
+        cache.set(CATALOG_CHANGED_KEY, timezone.now() - timedelta(minutes=5), None)
+
+    def test_repeat_visit_gets_304_until_the_product_changes(self):
+        url = self.product.get_absolute_url()
+        response = self.client.get(url)
+        etag, last_modified = response['ETag'], response['Last-Modified']
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 304)
+
+        self.product.price = 12
+        self.product.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_listing_etag_follows_deletes(self):
+        other = Product.objects.create(category=self.category, name='Boot', description='-', price=10)
+        url = reverse('sportova:category_detail', args=[self.category.slug])
+        etag = self.client.get(url)['ETag']
+        other.delete()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_last_modified_follows_deletes(self):
+        other = Product.objects.create(category=self.category, name='Boot', description='-', price=10)
+        self.age_catalog()
+        url = reverse('sportova:category_detail', args=[self.category.slug])
+        last_modified = self.client.get(url)['Last-Modified']
+        other.delete()
+        self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 200)
+
+    def test_no_last_modified_within_the_second_of_a_change(self):
+        bump_catalog_version()
+        response = self.client.get(self.product.get_absolute_url())
+        self.assertIn('ETag', response)
+        self.assertNotIn('Last-Modified', response)
+
+    def test_unknown_slug_still_404s(self):
+        self.assertEqual(self.client.get(reverse('sportova:product_detail', args=['missing'])).status_code, 404)
+
+
+class OutboundEmailQueueTests(TestCase):
+    def setUp(self):
+        self.contact_message = ContactMessage.objects.create(
+            name='Ali', email='ali@example.com', subject='Sizes', message='Do you have XL?'
+        )
+
+    @override_settings(SPORTOVA_OWNER_EMAIL='owner@example.com')
+    def test_contact_post_queues_emails_without_sending(self):
+        response = self.client.post(reverse('sportova:contact'), {
+            'name': 'Sara', 'email': 'sara@example.com', 'subject': 'Gloves', 'message': 'Hello',
+        })
+        self.assertRedirects(response, reverse('sportova:contact'))
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(OutboundEmail.objects.filter(status='pending').count(), 2)
+
+        call_command('process_email_queue', '--once', stdout=StringIO())
+        self.assertEqual(sorted(m.to[0] for m in mail.outbox), ['owner@example.com', 'sara@example.com'])
+        self.assertEqual(OutboundEmail.objects.filter(status='sent').count(), 2)
+
+    def test_reply_is_marked_sent_after_delivery(self):
+        reply = ContactReply.objects.create(
+            contact_message=self.contact_message, reply_subject='Re', reply_message='Yes'
+        )
+        self.assertEqual(process_email_queue(), {'sent': 1, 'retry': 0, 'dead': 0})
+        reply.refresh_from_db()
+        self.contact_message.refresh_from_db()
+        self.assertTrue(reply.email_sent)
+        self.assertEqual(self.contact_message.status, 'in_progress')
+        self.assertIsNotNone(self.contact_message.replied_at)
+
+    def test_failures_back_off_then_dead_letter(self):
+        outbound = OutboundEmail.objects.create(kind='contact_notification', contact_message=self.contact_message)
+        with mock.patch('django.core.mail.backends.locmem.EmailBackend.send_messages', side_effect=OSError('smtp down')), \
+                mock.patch('sportova.tasks.EMAIL_QUEUE_MAX_ATTEMPTS', 2), \
+                self.assertLogs('sportova.tasks', 'WARNING'):
+            self.assertEqual(process_email_queue()['retry'], 1)
+            outbound.refresh_from_db()
+            self.assertEqual((outbound.status, outbound.attempts), ('pending', 1))
+            self.assertGreater(outbound.next_attempt_at, outbound.updated_at)
+            # Not due yet
+            self.assertEqual(process_email_queue()['retry'], 0)
+
+            OutboundEmail.objects.filter(pk=outbound.pk).update(next_attempt_at=outbound.created_at)
+            self.assertEqual(process_email_queue()['dead'], 1)
+        outbound.refresh_from_db()
+        self.assertEqual(outbound.status, 'dead')
+        self.assertEqual(outbound.last_error, 'smtp down')
+
+
+class EmailConnectionPoolTests(TestCase):
+    def test_messages_share_one_connection(self):
+        pool = EmailConnectionPool()
+        messages = [mail.EmailMessage('Hi', 'Body', to=[f'user{i}@example.com']) for i in range(3)]
+        with mock.patch('sportova.mail.get_connection', wraps=mail.get_connection) as get_connection:
+            results = pool.send_messages(messages)
+        self.assertEqual(get_connection.call_count, 1)
+        self.assertEqual([error for _, error in results], [None, None, None])
+        self.assertEqual(len(mail.outbox), 3)
+
+    def test_reconnects_once_when_server_drops_connection(self):
+        pool = EmailConnectionPool()
+        pool.send_messages([mail.EmailMessage('Warm up', 'Body', to=['a@example.com'])])
+        dropped = mock.Mock()
+        dropped.send_messages.side_effect = smtplib.SMTPServerDisconnected('gone')
+        pool._connection = dropped
+
+        with self.assertLogs('sportova.mail', 'WARNING'):
+            results = pool.send_messages([mail.EmailMessage('Hi', 'Body', to=['b@example.com'])])
+        self.assertIsNone(results[0][1])
+        self.assertEqual(mail.outbox[-1].to, ['b@example.com'])
+
+    def test_idle_connection_is_replaced(self):
+        pool = EmailConnectionPool(idle_timeout=0)
+        pool.send_messages([mail.EmailMessage('One', 'Body', to=['a@example.com'])])
+        first = pool._connection
+        pool._last_used -= 1
+        pool.send_messages([mail.EmailMessage('Two', 'Body', to=['a@example.com'])])
+        self.assertIsNot(pool._connection, first)
+
+
+class EmailRendererTests(TestCase):
+    def test_templates_compiled_once_and_timed(self):
+        renderer = EmailRenderer()
+        contact_message = ContactMessage(id=7, name='Ali', email='ali@example.com', subject='Sizes', message='XL?')
+        for _ in range(3):
+            html, text = renderer.render('contact_notification', contact_message=contact_message)
+        # The cached template loader hands out the same compiled template every time
+        name = 'emails/contact_notification.txt'
+        self.assertIs(get_template(name).template, get_template(name).template)
+        self.assertIn('ali@example.com', text)
+        self.assertIn('ali@example.com', html)
+        self.assertEqual(renderer.stats()['emails/contact_notification.txt']['count'], 3)
+
+
+class SlugAllocationTests(TestCase):
+    def setUp(self):
+        self.category = Category.objects.create(name='Football')
+
+    def make_product(self, name='Training Football'):
+        return Product.objects.create(category=self.category, name=name, description='-', price=10)
+
+    def test_suffixes_follow_highest_taken(self):
+        slugs = [self.make_product().slug for _ in range(3)]
+        self.make_product('Training Football Boots')
+        self.assertEqual(slugs, ['training-football', 'training-football-1', 'training-football-2'])
+        with self.assertNumQueries(1):
+            self.assertEqual(next_free_slug(Product, 'training-football'), 'training-football-3')
+
+    def test_taken_slugs_are_found_through_the_index(self):
+        self.make_product()
+        self.make_product('Training Football Boots')
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(allocate_slugs(Product, ['Training Football', 'Training']), ['training-football-1', 'training'])
+        if connection.vendor == 'sqlite':
+            self.assertNotIn('LIKE', queries[0]['sql'])
+
+    def test_suffix_fits_max_length(self):
+        Category.objects.create(name='x' * 100, slug='x' * 100)
+        self.assertEqual(next_free_slug(Category, 'x' * 100), 'x' * 98)
+
+    def test_retries_when_concurrent_insert_takes_slug(self):
+        real_next_free_slug = next_free_slug
+        calls = []
+
+        def stale_allocation(model, base_slug, **kwargs):
+            calls.append(base_slug)
+            if len(calls) == 1:
+                # Simulate another request having claimed the slug after our lookup
+                return 'training-football'
+            return real_next_free_slug(model, base_slug, **kwargs)
+
+        self.make_product()
+        with mock.patch('sportova.slugs.next_free_slug', side_effect=stale_allocation):
+            product = self.make_product()
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(product.slug, 'training-football-1')
+
+
+class ImportCatalogTests(TestCase):
+    def write_feed(self, name, content):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, name)
+        with open(path, 'w') as feed:
+            feed.write(content)
+        return path
+
+    def test_allocate_slugs_avoids_existing_and_batch_duplicates(self):
+        category = Category.objects.create(name='Football')
+        Product.objects.create(category=category, name='Ball', description='-', price=1)
+        self.assertEqual(
+            allocate_slugs(Product, ['Ball', 'Ball', 'Ball 1', 'Glove']),
+            ['ball-1', 'ball-2', 'ball-1-1', 'glove'],
+        )
+
+    def test_csv_import_upserts_by_sku(self):
+        path = self.write_feed('feed.csv', (
+            'sku,name,category,description,price,size,is_featured\n'
+            'A1,Training Football,Football,Size 5 ball,19.99,5,true\n'
+            'A2,Training Football,Football,Size 4 ball,17.99,4,false\n'
+            'B1,Keeper Gloves,Gloves,Grip,30.00,,no\n'
+        ))
+        call_command('import_catalog', path, '--batch-size', '2', stdout=StringIO())
+        self.assertEqual(
+            sorted(Product.objects.values_list('sku', 'slug')),
+            [('A1', 'training-football'), ('A2', 'training-football-1'), ('B1', 'keeper-gloves')],
+        )
+        self.assertEqual(Category.objects.get(name='Football').product_count, 2)
+
+        update = self.write_feed('update.jsonl', (
+            '{"sku": "A2", "name": "Training Football Pro", "category": "Gloves", "price": "21.50"}\n'
+        ))
+        call_command('import_catalog', update, stdout=StringIO())
+        product = Product.objects.get(sku='A2')
+        self.assertEqual((product.name, product.slug, str(product.price)), ('Training Football Pro', 'training-football-1', '21.50'))
+        self.assertEqual(Product.objects.count(), 3)
+        self.assertEqual(
+            dict(Category.objects.values_list('name', 'product_count')),
+            {'Football': 1, 'Gloves': 2},
+        )
+
+    def test_null_and_missing_values_are_rejected(self):
+        feeds = [
+            ('null.jsonl', '{"sku": null, "name": "Ball", "category": "Football", "price": "10"}\n'),
+            ('short.csv', 'sku,name,category,price\nA1,Ball\n'),
+        ]
+        for name, content in feeds:
+            with self.subTest(name), self.assertRaisesMessage(CommandError, 'Row 1: sku, name and category are required'):
+                call_command('import_catalog', self.write_feed(name, content), stdout=StringIO())
+        self.assertFalse(Product.objects.exists())
+
+    def test_bad_row_keeps_committed_batches_consistent(self):
+        path = self.write_feed('feed.csv', (
+            'sku,name,category,price\n'
+            'A1,Ball,Football,10\n'
+            'A2,Boot,Football,20\n'
+            'A3,Pump,Football,not-a-price\n'
+        ))
+        version = get_catalog_version()
+        with self.assertRaisesMessage(CommandError, "Row 3: invalid price 'not-a-price'"):
+            call_command('import_catalog', path, '--batch-size', '2', stdout=StringIO())
+        self.assertEqual(Product.objects.count(), 2)
+        self.assertEqual(Category.objects.get(name='Football').product_count, 2)
+        self.assertNotEqual(get_catalog_version(), version)
+
+
+class GenerateCatalogTests(TestCase):
+    def generate(self, seed, clear=True):
+        call_command(
+            'generate_catalog', '--categories', '3', '--products', '25', '--images', '2',
+            '--messages', '5', '--seed', str(seed), '--batch-size', '10', *(['--clear'] if clear else []),
+            stdout=StringIO(),
+        )
+        return list(Product.objects.order_by('sku').values_list('sku', 'name', 'price', 'category__name'))
+
+    def test_generation_is_deterministic_for_a_seed(self):
+        first = self.generate(7)
+        self.assertEqual(len(first), 25)
+        self.assertEqual(ProductImage.objects.count(), 50)
+        self.assertEqual(ContactMessage.objects.count(), 5)
+        self.assertEqual(sum(Category.objects.values_list('product_count', flat=True)), 25)
+        self.assertEqual(self.generate(7), first)
+
+    def test_clear_and_repeated_runs(self):
+        self.generate(7)
+        products = self.generate(8, clear=False)
+        self.assertEqual(len({sku for sku, *_ in products}), 50)
+        self.assertEqual(sum(Category.objects.values_list('product_count', flat=True)), 50)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.generate(9)
+        # One DELETE per table rather than per-row signal work
+        deletes = [query['sql'] for query in queries if query['sql'].startswith('DELETE FROM "sportova_product')]
+        self.assertEqual(len(deletes), 2)
+        self.assertEqual(Product.objects.count(), 25)
+        self.assertEqual(ProductImage.objects.count(), 50)
+        self.assertEqual(sum(Category.objects.values_list('product_count', flat=True)), 25)
+
+
+class CursorPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(name='Football')
+        Product.objects.bulk_create([
+            Product(category=cls.category, name=f'Ball {i}', slug=f'ball-{i}', description='-', price=1)
+            for i in range(20)
+        ])
+        # Shared timestamps exercise the id tie-breaker
+        Product.objects.update(created_at=Product.objects.first().created_at)
+        Category.objects.all().refresh_product_counts()
+
+    def test_pages_walk_forward_and_back_without_gaps(self):
+        paginator = CursorPaginator(Product.objects.all(), 9)
+        expected = list(Product.objects.order_by('-created_at', '-id').values_list('pk', flat=True))
+
+        seen = []
+        page = paginator.get_page()
+        self.assertFalse(page.has_previous())
+        while True:
+            seen.extend(product.pk for product in page)
+            if not page.has_next():
+                break
+            page = paginator.get_page(after=page.next_cursor)
+        self.assertEqual(seen, expected)
+
+        previous = paginator.get_page(before=page.previous_cursor)
+        self.assertEqual([p.pk for p in previous], expected[9:18])
+        self.assertTrue(previous.has_previous())
+
+    def test_product_list_uses_cursor_links_and_keeps_page_numbers(self):
+        url = reverse('sportova:product_list')
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(url)
+        self.assertFalse(any('COUNT(*)' in query['sql'] for query in captured))
+        self.assertContains(response, '?after=')
+
+        response = self.client.get(url, {'page': 3})
+        self.assertEqual(len(response.context['products']), 2)
+        self.assertContains(response, '?page=2')
+
+    def test_category_detail_is_paginated(self):
+        response = self.client.get(self.category.get_absolute_url())
+        self.assertEqual(len(response.context['products']), 9)
+        self.assertContains(response, '20 items')
+
+
+class ProductFacetTests(TestCase):
+    def setUp(self):
+        self.football = Category.objects.create(name='Football')
+        self.boots = Category.objects.create(name='Boots')
+        self.make_product(self.football, 'Ball', '5', 20, True)
+        self.make_product(self.football, 'Ball Pro', '5', 120, False)
+        self.make_product(self.football, 'Ball Junior', '4', 30, False)
+        self.make_product(self.boots, 'Boot', '9', 80, True)
+
+    def make_product(self, category, name, size, price, featured):
+        return Product.objects.create(
+            category=category, name=name, description='-', size=size, price=price, is_featured=featured
+        )
+
+    def test_counts_apply_the_other_facets(self):
+        categories = [self.football, self.boots]
+        filters = FacetFilters({'category': 'football', 'size': '5'}, categories)
+        counts = facet_counts(get_facet_summary(), filters)
+        self.assertEqual(counts['category'], {self.football.pk: 2})
+        self.assertEqual(counts['size'], {'5': 2, '4': 1})
+        self.assertEqual(counts['price'], {'under-25': 1, '100-200': 1})
+        self.assertEqual(counts['featured'][True], 1)
+
+    def test_summary_is_one_cached_query_until_products_change(self):
+        with self.assertNumQueries(1):
+            get_facet_summary()
+            get_facet_summary()
+        self.make_product(self.boots, 'Boot Lite', '8', 60, False)
+        self.assertEqual(sum(row[-1] for row in get_facet_summary()), 5)
+
+    def test_product_list_filters(self):
+        url = reverse('sportova:product_list')
+        response = self.client.get(url, {'category': 'football', 'price': '25-50'})
+        self.assertEqual([p.name for p in response.context['products']], ['Ball Junior'])
+        response = self.client.get(url, {'featured': '1', 'size': '9'})
+        self.assertEqual([p.name for p in response.context['products']], ['Boot'])
+        self.assertContains(response, 'Featured only (1)')
+        self.assertEqual(self.client.get(url, {'category': 'missing'}).status_code, 404)
+
+
+class ProductSearchTests(TestCase):
+    def setUp(self):
+        self.football = Category.objects.create(name='Football')
+        self.gloves = Category.objects.create(name='Goalkeeper Gloves')
+        self.ball = self.make_product(self.football, 'Match Football', 'Official size 5 ball')
+        self.trainer = self.make_product(self.football, 'Training Cones', 'Use with any football drill')
+        self.glove = self.make_product(self.gloves, 'Pro Grip Gloves', 'Latex palm for keepers')
+
+    def make_product(self, category, name, description):
+        return Product.objects.create(category=category, name=name, description=description, price=10)
+
+    def test_ranking_prefix_and_category_filter(self):
+        self.assertEqual(search_product_ids('football'), [self.ball.pk, self.trainer.pk])
+        self.assertEqual(search_product_ids('foot'), [self.ball.pk, self.trainer.pk])
+        self.assertEqual(search_product_ids('grip latex'), [self.glove.pk])
+        self.assertEqual(search_product_ids('gloves', category_id=self.football.pk), [])
+        self.assertEqual(search_product_ids('"*) OR ('), [])
+
+    def test_index_follows_saves_and_deletes(self):
+        self.glove.name = 'Fingersave Gloves'
+        self.glove.save()
+        self.assertEqual(search_product_ids('fingersave'), [self.glove.pk])
+        self.glove.delete()
+        self.assertEqual(search_product_ids('fingersave'), [])
+
+    def test_search_view(self):
+        response = self.client.get(reverse('sportova:search'), {'q': 'matc', 'category': 'football'})
+        self.assertEqual(list(response.context['products']), [self.ball])
+        self.assertContains(response, '1 result for')
+
+
+def make_jpeg(width, height):
+    from PIL import Image
+    buffer = BytesIO()
+    Image.linear_gradient('L').resize((width, height)).convert('RGB').save(buffer, 'JPEG', quality=95)
+    return buffer.getvalue()
+
+
+class ImageVariantTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root.name))
+        category = Category.objects.create(name='Football')
+        self.product = Product.objects.create(category=category, name='Ball', description='-', price=10)
+
+    def upload(self, width=2400, height=1600, content=None):
+        with self.captureOnCommitCallbacks(execute=True):
+            image = ProductImage.objects.create(
+                product=self.product, image=SimpleUploadedFile('ball.jpg', content or make_jpeg(width, height))
+            )
+        call_command('generate_image_variants', once=True, workers=1, stdout=StringIO())
+        return image
+
+    def test_upload_creates_width_and_format_variants(self):
+        from PIL import Image
+        image = self.upload()
+        storage = image.image.storage
+        for width in VARIANT_WIDTHS:
+            for fmt in ('webp', 'jpeg'):
+                with storage.open(variant_name(image.image.name, width, fmt)) as f:
+                    self.assertEqual(Image.open(f).width, width)
+        thumbnail = storage.size(variant_name(image.image.name, 320, 'webp'))
+        self.assertLess(thumbnail * 10, storage.size(image.image.name))
+
+    def test_tag_emits_srcset_once_variants_exist(self):
+        template = Template('{% load sportova_images %}{% responsive_image image alt="Ball" data_placeholder="/p.jpg" %}')
+        image = self.upload(800, 600)
+        html = template.render(Context({'image': image.image}))
+        self.assertIn('<source type="image/webp"', html)
+        self.assertIn('.320w.webp 320w', html)
+        self.assertIn('.960w.jpg 960w', html)
+        self.assertIn('onerror=', html)
+
+        missing = ProductImage(product=self.product, image='products/gallery/missing.jpg')
+        html = template.render(Context({'image': missing.image}))
+        self.assertTrue(html.startswith('<img src="/media/products/gallery/missing.jpg"'))
+
+    def test_upload_is_queued_not_built_on_the_request_thread(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            image = ProductImage.objects.create(
+                product=self.product, image=SimpleUploadedFile('ball.jpg', make_jpeg(800, 600))
+            )
+        job = ImageVariantJob.objects.get(name=image.image.name)
+        self.assertEqual(job.status, 'pending')
+        self.assertFalse(image.image.storage.exists(variant_name(image.image.name, 320, 'jpeg')))
+
+    def test_broken_upload_is_logged_not_raised(self):
+        with self.assertLogs('sportova.images', 'WARNING'):
+            image = self.upload(content=b'not an image')
+        job = ImageVariantJob.objects.get(name=image.image.name)
+        self.assertEqual((job.status, job.attempts), ('failed', 1))
+
+    def test_backfill_scan_is_idempotent_and_follows_changes(self):
+        image = self.upload(800, 600)
+        storage = image.image.storage
+        os.makedirs(os.path.join(storage.location, 'legacy'))
+        with open(os.path.join(storage.location, 'legacy', 'old.jpg'), 'wb') as f:
+            f.write(make_jpeg(400, 300))
+
+        out = StringIO()
+        call_command('generate_image_variants', scan=True, once=True, workers=1, stdout=out)
+        self.assertIn('Queued 1 new, requeued 0 changed', out.getvalue())
+        self.assertIn('Built 1,', out.getvalue())
+        self.assertTrue(storage.exists(variant_name('legacy/old.jpg', 320, 'jpeg')))
+
+        out = StringIO()
+        call_command('generate_image_variants', scan=True, once=True, workers=1, stdout=out)
+        self.assertIn('Queued 0 new, requeued 0 changed', out.getvalue())
+        self.assertNotIn('Built', out.getvalue())
+
+        # Touched but identical: requeued by mtime, then skipped by hash
+        path = storage.path('legacy/old.jpg')
+        os.utime(path, (os.path.getatime(path), os.path.getmtime(path) + 10))
+        out = StringIO()
+        call_command('generate_image_variants', scan=True, once=True, workers=1, stdout=out)
+        self.assertIn('requeued 1 changed', out.getvalue())
+        self.assertIn('Built 0, unchanged 1', out.getvalue())
+
+
+class RequestTimingTests(TestCase):
+    def setUp(self):
+        reset_request_stats()
+        self.category = Category.objects.create(name='Football')
+        Product.objects.create(category=self.category, name='Ball', description='-', price=10)
+
+    @override_settings(SPORTOVA_CATALOG_CACHE_ENABLED=False)
+    def test_server_timing_header_and_per_view_stats(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('sportova:category_detail', args=[self.category.slug]))
+        self.assertIn(f'desc="{len(queries)} queries"', response['Server-Timing'])
+        self.assertRegex(response['Server-Timing'], r'tpl;dur=[\d.]+, total;dur=[\d.]+')
+
+        self.client.get(reverse('sportova:category_detail', args=[self.category.slug]))
+        stats = get_request_stats()['sportova:category_detail']
+        self.assertEqual(stats['count'], 2)
+        self.assertEqual(sum(stats['histogram'].values()), 2)
+        self.assertGreater(stats['mean_template_ms'], 0)
+
+    @override_settings(SPORTOVA_CATALOG_CACHE_ENABLED=False, SPORTOVA_QUERY_BUDGETS={'sportova:category_list': 0})
+    def test_query_budget_warns_or_raises(self):
+        with self.assertLogs('sportova.instrumentation', 'WARNING'):
+            self.client.get(reverse('sportova:category_list'))
+        with override_settings(SPORTOVA_QUERY_BUDGET_ACTION='raise'):
+            with self.assertRaises(QueryBudgetExceeded):
+                self.client.get(reverse('sportova:category_list'))
+
+
+class ProductCardCacheTests(TestCase):
+    def setUp(self):
+        bump_catalog_version()
+        self.category = Category.objects.create(name='Football')
+        self.product = Product.objects.create(category=self.category, name='Ball', description='-', price=10)
+        self.card = get_template('sportova/includes/product_card.html')
+
+    def render_card(self, **context):
+        product = Product.objects.with_card_data().get(pk=self.product.pk)
+        return self.card.render({'product': product, **context}, RequestFactory().get('/'))
+
+    def test_card_cached_until_product_changes(self):
+        self.assertIn('Ball', self.render_card())
+        # A bulk update skips the signals and updated_at, so the cached card is served
+        Product.objects.filter(pk=self.product.pk).update(name='Match Ball')
+        self.assertNotIn('Match Ball', self.render_card())
+        # Other catalog changes leave the card alone
+        bump_catalog_version()
+        self.assertNotIn('Match Ball', self.render_card())
+        self.product.refresh_from_db()
+        self.product.save()
+        self.assertIn('Match Ball', self.render_card())
+
+    def test_image_and_category_changes_refresh_the_card(self):
+        self.assertIn('No image', self.render_card())
+        image = ProductImage.objects.create(product=self.product, image='products/gallery/ball.jpg')
+        self.assertIn('products/gallery/ball', self.render_card())
+        image.delete()
+        self.assertIn('No image', self.render_card())
+
+        self.category.name = 'Soccer'
+        self.category.save()
+        self.assertIn('Soccer', self.render_card())
+
+    def test_hide_category_is_cached_separately(self):
+        self.assertIn('sportova-category-badge', self.render_card())
+        self.assertNotIn('sportova-category-badge', self.render_card(hide_category=True))
+
+    @override_settings(SPORTOVA_PRODUCT_CARD_CACHE_TIMEOUT=0)
+    def test_timeout_zero_disables_cache(self):
+        self.render_card()
+        Product.objects.filter(pk=self.product.pk).update(name='Match Ball')
+        self.assertIn('Match Ball', self.render_card())
+
+    @override_settings(SPORTOVA_CATALOG_CACHE_ENABLED=False)
+    def test_profiler_reports_each_template(self):
+        with TemplateProfiler() as profiler:
+            self.client.get(reverse('sportova:product_list'))
+        stats = profiler.stats
+        self.assertEqual(stats['sportova/includes/product_card.html']['calls'], 1)
+        self.assertEqual(stats['base.html']['calls'], 1)
+        page = stats['sportova/product_list.html']
+        self.assertLessEqual(page['self'], page['total'])
+
+
+@override_settings(WHATSAPP_NUMBER='+1 (555) 010-2030', CONTACT_EMAIL='shop@example.com')
+class ContactLinkTests(TestCase):
+    def setUp(self):
+        clear_contact_caches()
+        self.addCleanup(clear_contact_caches)
+        category = Category.objects.create(name='Football')
+        Product.objects.create(category=category, name='Ball & Pump', description='-', price=10, size='5')
+
+    def test_whatsapp_and_mailto_urls(self):
+        product = Product.objects.get()
+        self.assertEqual(
+            product.get_whatsapp_url(),
+            'https://wa.me/15550102030?text=Hi%2C%20I%27m%20interested%20in%20Ball%20%26%20Pump%20%28Size%3A%205%29%20-%20%2410.00',
+        )
+        mailto = product.get_mailto_url()
+        self.assertTrue(mailto.startswith('mailto:shop@example.com?subject=Inquiry%20about%20Ball%20%26%20Pump&body=Hi%2C'))
+
+    def test_links_memoized_until_product_changes(self):
+        product = Product.objects.get()
+        with mock.patch('sportova.contacts.whatsapp_url', wraps=lambda text: text) as build:
+            Product.objects.get().get_whatsapp_url()
+            product.get_whatsapp_url()
+            self.assertEqual(build.call_count, 1)
+            product.name = 'Match Ball'
+            product.save()
+            self.assertIn('Match Ball', product.get_whatsapp_url())
+            self.assertEqual(build.call_count, 2)
+
+    def test_number_cleaned_once_and_reset_with_settings(self):
+        self.assertEqual(site_contacts(None)['WHATSAPP_NUMBER_CLEAN'], '15550102030')
+        with override_settings(WHATSAPP_NUMBER='+44 20 7946 0000'):
+            self.assertEqual(whatsapp_number(), '442079460000')
+        self.assertEqual(whatsapp_number(), '15550102030')
+
+
+@override_settings(ROOT_URLCONF=storefront_urlconf('sportova.async_urls'), SPORTOVA_CATALOG_CACHE_ENABLED=False)
+class AsyncViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(name='Football')
+        cls.product = Product.objects.create(
+            category=cls.category, name='Match Ball', description='Size 5 match ball', price=30, is_featured=True,
+        )
+        ProductImage.objects.create(product=cls.product, image='products/gallery/match-ball.jpg', is_primary=True)
+
+    async def test_catalog_pages_render(self):
+        urls = [
+            reverse('sportova:home'),
+            reverse('sportova:product_list'),
+            f"{reverse('sportova:product_list')}?page=1",
+            self.product.get_absolute_url(),
+            reverse('sportova:category_list'),
+            self.category.get_absolute_url(),
+            f"{reverse('sportova:search')}?q=ball",
+            reverse('sportova:shipment'),
+            reverse('sportova:contact'),
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                response = await self.async_client.get(url)
+                self.assertEqual(response.status_code, 200)
+        response = await self.async_client.get(self.category.get_absolute_url())
+        self.assertContains(response, 'match-ball.jpg')
+        self.assertNotIn('"0 queries"', response['Server-Timing'])
+
+    async def test_unknown_slug_is_404(self):
+        response = await self.async_client.get(reverse('sportova:product_detail', args=['no-such-product']))
+        self.assertEqual(response.status_code, 404)
+
+    async def test_conditional_get(self):
+        url = self.product.get_absolute_url()
+        etag = (await self.async_client.get(url))['ETag']
+        response = await self.async_client.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+
+    async def test_contact_queues_emails(self):
+        response = await self.async_client.post(reverse('sportova:contact'), {
+            'name': 'Ana', 'email': 'ana@example.com', 'subject': 'Sizes', 'message': 'Do you have size 4?',
+        })
+        self.assertRedirects(response, reverse('sportova:contact'), fetch_redirect_response=False)
+        self.assertEqual(await ContactMessage.objects.acount(), 1)
+        self.assertEqual(await OutboundEmail.objects.acount(), 2)
+
+
+class AdminChangelistQueryTests(TestCase):
+    def setUp(self):
+        from django.contrib.auth.models import User
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'pw'))
+        self.category = Category.objects.create(name='Football')
+
+    def add_rows(self, count):
+        for i in range(count):
+            message = ContactMessage.objects.create(name='A', email='a@example.com', subject=f'S{i}', message='-')
+            ContactReply.objects.create(contact_message=message, reply_subject='Re', reply_message='-')
+            product = Product.objects.create(category=self.category, name=f'Ball {i}', description='-', price=10)
+            ProductImage.objects.create(product=product, image=f'products/gallery/ball-{i}.jpg')
+
+    def changelist_queries(self, model):
+        url = reverse(f'admin:sportova_{model}_changelist')
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get(url).status_code, 200)
+        return len(queries)
+
+    def test_changelists_do_not_query_per_row(self):
+        models = ['contactmessage', 'contactreply', 'product', 'productimage']
+        self.add_rows(2)
+        few = {model: self.changelist_queries(model) for model in models}
+        self.add_rows(20)
+        many = {model: self.changelist_queries(model) for model in models}
+        self.assertEqual(few, many)
+
+    def test_product_search_uses_the_index_and_exact_sku(self):
+        Product.objects.create(category=self.category, name='Basketball', description='-', price=10)
+        Product.objects.create(category=self.category, name='Ball Pump', sku='BP-1', description='-', price=10)
+        Product.objects.create(category=self.category, name='Cones', description='For drills', price=10)
+        url = reverse('admin:sportova_product_changelist')
+
+        def search(term):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url, {'q': term})
+            self.assertFalse([query for query in queries if 'LIKE' in query['sql']])
+            return sorted(product.name for product in response.context['cl'].result_list)
+
+        self.assertEqual(search('ball'), ['Ball Pump'])
+        self.assertEqual(search('BP-1'), ['Ball Pump'])
+        self.assertEqual(search('drill'), ['Cones'])
+        # Category names are indexed with each product
+        self.assertEqual(search('footb'), ['Ball Pump', 'Basketball', 'Cones'])
+
+    def test_reply_count_is_annotated(self):
+        self.add_rows(1)
+        response = self.client.get(reverse('admin:sportova_contactmessage_changelist'))
+        self.assertContains(response, '<td class="field-reply_count">1</td>', html=True)
+
+
+class StaticAssetTests(TestCase):
+    def test_minify_keeps_strings_and_drops_comments(self):
+        css = '/* head */\na > b , c {\n    color : red ;\n    content: "a  /* b */";\n}\n'
+        self.assertEqual(minify_css(css), 'a>b,c{color :red;content:"a  /* b */"}')
+
+    def test_pages_link_source_stylesheets_until_collected(self):
+        response = self.client.get(reverse('sportova:shipment'))
+        self.assertContains(response, '<link rel="stylesheet" href="/static/css/base.css">')
+        self.assertContains(response, '<link rel="stylesheet" href="/static/css/shipment.css">')
+        self.assertNotContains(response, '<style>')
+
+    def test_templates_only_reference_existing_static_files(self):
+        import re
+        from pathlib import Path
+        from django.conf import settings
+        from django.contrib.staticfiles import finders
+        templates = Path(settings.TEMPLATES[0]['DIRS'][0])
+        referenced = {
+            name
+            for path in templates.rglob('*.html')
+            for name in re.findall(r"{% static '([^']+)'", path.read_text())
+        }
+        self.assertIn('img/placeholder.svg', referenced)
+        self.assertEqual([name for name in sorted(referenced) if finders.find(name) is None], [])
+
+    def test_collectstatic_builds_hashed_compressed_bundles(self):
+        import gzip
+        from django.contrib.staticfiles.storage import staticfiles_storage
+        from .templatetags.sportova_assets import stylesheet_bundle
+
+        static_root = tempfile.TemporaryDirectory()
+        self.addCleanup(static_root.cleanup)
+        self.enterContext(override_settings(STATIC_ROOT=static_root.name))
+        call_command('collectstatic', interactive=False, verbosity=0)
+
+        hashed = staticfiles_storage.hashed_files['css/sportova.bundle.css']
+        self.assertRegex(hashed, r'^css/sportova\.bundle\.[0-9a-f]{12}\.css$')
+        with staticfiles_storage.open(hashed) as f:
+            bundle = f.read()
+        self.assertNotIn(b'/*', bundle)
+        with staticfiles_storage.open(f'{hashed}.gz') as f:
+            self.assertEqual(gzip.decompress(f.read()), bundle)
+        self.assertIn(hashed, stylesheet_bundle('sportova'))
+
+
+class VendorAssetTests(TestCase):
+    def setUp(self):
+        from .assets import vendor_manifest
+        vendor_manifest.cache_clear()
+        self.addCleanup(vendor_manifest.cache_clear)
+
+    def test_font_awesome_css_keeps_used_icons_only(self):
+        from .management.commands.vendor_assets import subset_font_awesome_css
+        css = (
+            '.fa-solid{font-weight:900}'
+            '.fa-whatsapp:before{content:"\\f232"}'
+            '.fa-phone:before,.fa-phone-alt:before{content:"\\f095"}'
+            '@font-face{src:url(../webfonts/fa-brands-400.woff2) format("woff2"),'
+            'url(../webfonts/fa-brands-400.ttf) format("truetype")}'
+        )
+        subset, codepoints = subset_font_awesome_css(css, {'fa-whatsapp', 'fa-phone-alt'})
+        self.assertEqual(subset, (
+            '.fa-solid{font-weight:900}'
+            '.fa-whatsapp:before{content:"\\f232"}'
+            '.fa-phone-alt:before{content:"\\f095"}'
+            '@font-face{src:url(../webfonts/fa-brands-400.woff2) format("woff2")}'
+        ))
+        self.assertEqual(codepoints, {0xf232, 0xf095})
+
+    def test_font_weights_come_from_css_and_bootstrap_classes(self):
+        from .management.commands.vendor_assets import used_font_weights
+        text = 'h1 { font-weight: bold; } .x { font-weight: 600 }<p class="lead fw-semibold">'
+        self.assertEqual(used_font_weights(text), {300, 400, 600, 700})
+
+    def test_pages_use_cdn_until_vendored_then_local_files(self):
+        html = Template('{% load sportova_assets %}{% vendor_stylesheets %}{% vendor_scripts %}')
+        with mock.patch('django.contrib.staticfiles.finders.find', return_value=None):
+            rendered = html.render(Context())
+        self.assertIn('https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css', rendered)
+        self.assertIn('family=Space+Grotesk:wght@300;400;500;600;700&amp;family=JetBrains+Mono', rendered)
+
+        manifest = {
+            'stylesheets': ['vendor/bootstrap/bootstrap.min.css'],
+            'scripts': ['vendor/bootstrap/bootstrap.bundle.min.js'],
+            'preload': ['vendor/fonts/inter-400-latin.woff2'],
+        }
+        with mock.patch('sportova.templatetags.sportova_assets.vendor_manifest', return_value=manifest):
+            rendered = html.render(Context())
+        self.assertIn(
+            '<link rel="preload" href="/static/vendor/fonts/inter-400-latin.woff2" as="font" type="font/woff2" crossorigin>',
+            rendered,
+        )
+        self.assertIn('<script src="/static/vendor/bootstrap/bootstrap.bundle.min.js"></script>', rendered)
+        self.assertNotIn('https://', rendered)
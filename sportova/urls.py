@@ -9,6 +9,8 @@ urlpatterns = [
     path('product/<slug:slug>/', views.product_detail, name='product_detail'),
     path('categories/', views.category_list, name='category_list'),
     path('category/<slug:slug>/', views.category_detail, name='category_detail'),
+    path('search/', views.search, name='search'),
     path('shipment/', views.shipment, name='shipment'),
     path('contact/', views.contact, name='contact'),
+    path('css/backgrounds.<str:version>.css', views.background_stylesheet, name='background_stylesheet'),
 ]
@@ -1,16 +1,24 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib import messages
 from django.core.paginator import Paginator
+from django.http import HttpResponse
+from django.utils.cache import patch_cache_control
 from .models import Category, Product, Shipment, BannerPicture
+from .cache import catalog_cache_page, catalog_condition
+from .context_processors import get_background_stylesheet
+from .facets import FacetFilters, build_facets
 from .forms import ContactForm
-from .tasks import send_contact_notification_email, send_contact_confirmation_email
+from .pagination import paginate_products
+from .search import search_products
+from .tasks import enqueue_contact_emails
 
 
+@catalog_cache_page
 def home(request):
     """Homepage with featured products and categories"""
     categories = Category.objects.all()[:6]  # Show 6 categories
-    featured_products = Product.objects.filter(is_featured=True)[:6]
-    banner_pictures = BannerPicture.objects.all()[:5]
+    featured_products = Product.objects.with_card_data().filter(is_featured=True)[:6]
+    banner_pictures = BannerPicture.objects.filter(is_active=True)[:5]
     # banner_products = Product.objects.filter(image__in=banner_pictures.values('image'))
 
     context = {
@@ -23,34 +31,36 @@ def home(request):
     return render(request, 'sportova/home.html', context)
 
 
+@catalog_condition
+@catalog_cache_page
 def product_list(request):
-    """View to display all products"""
-    product_list = Product.objects.all().order_by('-created_at')
-    categories = Category.objects.all()
+    """View to display all products, filterable by category, size, price and featured"""
+    categories = list(Category.objects.all())
 
-    # Get category filter from query parameters
-    category_slug = request.GET.get('category')
-    if category_slug:
-        category = get_object_or_404(Category, slug=category_slug)
-        product_list = product_list.filter(category=category)
+    # Facet filters from the query string; counts come from a cached summary
+    filters = FacetFilters(request.GET, categories)
+    product_list = filters.apply(Product.objects.with_card_data().order_by('-created_at'))
 
-    # Pagination
-    paginator = Paginator(product_list, 9)  # Show 9 products per page
-    page_number = request.GET.get('page')
-    products = paginator.get_page(page_number)
+    # Cursor pagination (no COUNT or OFFSET); ?page=N still works
+    products = paginate_products(request, product_list, 9)  # Show 9 products per page
 
     context = {
         'products': products,
         'categories': categories,
-        'current_category': category_slug,
+        'current_category': filters.category.slug if filters.category else None,
+        'filters': filters,
+        'facets': build_facets(filters, categories),
+        'page_query': filters.query_prefix(),
     }
     return render(request, 'sportova/product_list.html', context)
 
 
+@catalog_condition
+@catalog_cache_page
 def product_detail(request, slug):
     """Product detail page showing image, price, description and contact options"""
-    product = get_object_or_404(Product, slug=slug)
-    related_products = Product.objects.filter(category=product.category).exclude(slug=slug)[:3]
+    product = get_object_or_404(Product.objects.with_card_data(), slug=slug)
+    related_products = Product.objects.with_card_data().filter(category=product.category).exclude(slug=slug)[:3]
     context = {
         'product': product,
         'category': product.category,
@@ -59,10 +69,12 @@ def product_detail(request, slug):
     return render(request, 'sportova/product_detail.html', context)
 
 
+@catalog_condition
+@catalog_cache_page
 def category_detail(request, slug):
     """Category page showing all products in that category"""
     category = get_object_or_404(Category, slug=slug)
-    products = Product.objects.filter(category=category)
+    products = paginate_products(request, Product.objects.with_card_data().filter(category=category), 9)
 
     context = {
         'category': category,
@@ -71,6 +83,8 @@ def category_detail(request, slug):
     return render(request, 'sportova/category_detail.html', context)
 
 
+@catalog_condition
+@catalog_cache_page
 def category_list(request):
     """Category list page showing all categories"""
     category_list = Category.objects.all().order_by('name')
@@ -86,6 +100,24 @@ def category_list(request):
     return render(request, 'sportova/category_list.html', context)
 
 
+def search(request):
+    """Product search with ranking, prefix matching and an optional category filter"""
+    query = request.GET.get('q', '').strip()
+    category_slug = request.GET.get('category')
+    category = get_object_or_404(Category, slug=category_slug) if category_slug else None
+    products = search_products(query, category.pk if category else None) if query else []
+
+    context = {
+        'query': query,
+        'products': products,
+        'categories': Category.objects.all(),
+        'current_category': category,
+    }
+    return render(request, 'sportova/search.html', context)
+
+
+@catalog_condition
+@catalog_cache_page
 def shipment(request):
     """Shipment detail page showing image, description, delivery time and cost"""
     shipment = Shipment.objects.all()
@@ -103,9 +135,8 @@ def contact(request):
             # Save the contact message
             contact_message = form.save()
 
-            # Send email notifications using tasks
-            notification_sent = send_contact_notification_email(contact_message)
-            confirmation_sent = send_contact_confirmation_email(contact_message)
+            # Queue email notifications; the process_email_queue worker sends them
+            enqueue_contact_emails(contact_message)
 
             # Show success message to user
             messages.success(request, 'Thanks for contacting Sportova! We will get back to you shortly.')
@@ -116,3 +147,17 @@ def contact(request):
         form = ContactForm()
 
     return render(request, 'sportova/contact.html', {'form': form})
+
+
+def background_stylesheet(request, version):
+    """Compiled section backgrounds; the URL changes with the content, so it is cached for a year"""
+    css, current = get_background_stylesheet()
+    if version != current:
+        # Either this process's copy or the page is out of date; ask the shared cache which
+        css, current = get_background_stylesheet(refresh=True)
+    if version != current:
+        # Page rendered before a background changed; send it to the current file
+        return redirect('sportova:background_stylesheet', version=current)
+    response = HttpResponse(css, content_type='text/css; charset=utf-8')
+    patch_cache_control(response, public=True, max_age=365 * 24 * 60 * 60, immutable=True)
+    return response
@@ -112,7 +112,7 @@ document.addEventListener('DOMContentLoaded', function() {
     // Image Error Handling
     document.querySelectorAll('img').forEach(img => {
         img.addEventListener('error', function() {
-            this.src = '/static/img/placeholder.jpg';
+            this.src = '/static/img/placeholder.svg';
             this.alt = 'Image not available';
         });
     });